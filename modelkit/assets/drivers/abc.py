@@ -65,7 +65,21 @@ class StorageDriver(abc.ABC):
 
     @property
     def client(self):
-        return self._client or self.build_client(self.client_configuration)
+        if self._client is not None:
+            return self._client
+        client = self.build_client(self.client_configuration)
+        if not self.lazy_driver:
+            # the client of an unpickled driver is built on first use
+            self._client = client
+        return client
+
+    def __getstate__(self):
+        # SDK clients hold connections and locks, they are not pickled. A client
+        # passed at instantiation is not carried over either: the unpickled
+        # driver builds its own from the configuration, when it is first used
+        state = self.__dict__.copy()
+        state["_client"] = None
+        return state
 
     @staticmethod
     @abc.abstractmethod
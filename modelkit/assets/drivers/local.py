@@ -1,4 +1,3 @@
-import glob
 import os
 import shutil
 from typing import Dict, Optional, Union
@@ -29,11 +28,31 @@ class LocalStorageDriver(StorageDriver):
         return None
 
     def iterate_objects(self, prefix: Optional[str] = None):
-        for filename in glob.iglob(
-            os.path.join(self.bucket, os.path.join("**", "*")), recursive=True
-        ):
-            if os.path.isfile(filename):
-                yield "/".join(os.path.split(os.path.relpath(filename, self.bucket)))
+        prefix = prefix or ""
+        # only walk the directory holding the objects that may match the prefix
+        prefix_dir = [x for x in prefix.rpartition("/")[0].split("/") if x]
+        yield from self._iterate_objects(os.path.join(self.bucket, *prefix_dir), prefix)
+
+    def _iterate_objects(self, dir_path: str, prefix: str):
+        try:
+            entries = os.scandir(dir_path)
+        except (FileNotFoundError, NotADirectoryError):
+            return
+        with entries:
+            for entry in entries:
+                # hidden files are not objects
+                if entry.name.startswith("."):
+                    continue
+                object_name = os.path.relpath(entry.path, self.bucket).replace(
+                    os.sep, "/"
+                )
+                if entry.is_dir():
+                    if object_name.startswith(prefix) or prefix.startswith(
+                        object_name + "/"
+                    ):
+                        yield from self._iterate_objects(entry.path, prefix)
+                elif entry.is_file() and object_name.startswith(prefix):
+                    yield object_name
 
     def upload_object(self, file_path, object_name):
         object_path = os.path.join(self.bucket, *object_name.split("/"))
@@ -48,9 +67,10 @@ class LocalStorageDriver(StorageDriver):
             os.remove(object_dir)
         os.makedirs(object_dir, exist_ok=True)
 
-        with open(file_path, "rb") as fsrc:
-            with open(object_path, "xb") as fdst:
-                shutil.copyfileobj(fsrc, fdst)
+        # the object is created exclusively, then filled by copyfile which
+        # copies in the kernel where possible (e.g. sendfile on Linux)
+        open(object_path, "xb").close()
+        shutil.copyfile(file_path, object_path)
 
     def download_object(self, object_name, destination_path):
         object_path = os.path.join(self.bucket, *object_name.split("/"))
@@ -62,9 +82,7 @@ class LocalStorageDriver(StorageDriver):
                 driver=self, bucket=self.bucket, object_name=object_name
             )
 
-        with open(object_path, "rb") as fsrc:
-            with open(destination_path, "wb") as fdst:
-                shutil.copyfileobj(fsrc, fdst)
+        shutil.copyfile(object_path, destination_path)
 
     def delete_object(self, object_name):
         object_path = os.path.join(self.bucket, *object_name.split("/"))
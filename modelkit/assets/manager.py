@@ -125,21 +125,17 @@ class AssetsManager:
         spec: AssetSpec,
         _force_download: bool,
     ) -> Dict[str, Any]:
-        local_path = os.path.join(
-            self.assets_dir, *spec.name.split("/"), spec.version or ""
-        )
-
+        local_name = self._local_name(spec)
         if not spec.version:
-            return _fetch_local_version(
-                spec.name, os.path.join(self.assets_dir, *spec.name.split("/"))
-            )
+            return _fetch_local_version(spec.name, local_name)
+        local_path = os.path.join(local_name, spec.version)
 
         if not self.storage_provider:
             if _force_download:
                 raise errors.StorageDriverError(
                     "can not force_download with no storage provider"
                 )
-            local_versions = self._list_local_versions(spec)
+            local_versions = spec.get_local_versions(local_name)
             if spec.version not in local_versions:
                 raise errors.LocalAssetDoesNotExistError(
                     name=spec.name,
@@ -162,7 +158,7 @@ class AssetsManager:
             with filelock.FileLock(lock_path, timeout=self.timeout):
                 # Update local versions after lock aquisition to account for concurrent
                 # download
-                local_versions = self._list_local_versions(spec)
+                local_versions = spec.get_local_versions(local_name)
 
                 if not _has_succeeded(local_path):
                     logger.info("Previous fetching of asset has failed, redownloading.")
@@ -198,18 +194,16 @@ class AssetsManager:
                     open(_success_file_path(local_path), "w").close()
 
         if spec.sub_part:
-            local_sub_part = os.path.join(
-                *(
-                    list(os.path.split(str(asset_dict["path"])))
-                    + [p for p in spec.sub_part.split("/") if p]
-                )
+            asset_dict["path"] = os.path.join(
+                local_path, *(p for p in spec.sub_part.split("/") if p)
             )
-            asset_dict["path"] = local_sub_part
         return asset_dict
 
+    def _local_name(self, spec: AssetSpec) -> str:
+        return os.path.join(self.assets_dir, *spec.name.split("/"))
+
     def _list_local_versions(self, spec: AssetSpec) -> List[str]:
-        local_name = os.path.join(self.assets_dir, *spec.name.split("/"))
-        return spec.get_local_versions(local_name)
+        return spec.get_local_versions(self._local_name(spec))
 
     def fetch_asset(
         self,
@@ -1,10 +1,12 @@
+import concurrent.futures
+import copy
 import datetime
 import glob
 import json
 import os
 import tempfile
 import time
-from typing import Any, Optional
+from typing import Any, Dict, Optional, Tuple
 
 import humanize
 from dateutil import parser, tz
@@ -12,35 +14,23 @@ from structlog import get_logger
 
 from modelkit.assets import errors
 from modelkit.assets.drivers.abc import StorageDriver
-
-try:
-    from modelkit.assets.drivers.azure import (
-        AzureStorageDriver,
-        AzureStorageDriverSettings,
-    )
-
-    has_az = True
-except ModuleNotFoundError:
-    has_az = False
-try:
-    from modelkit.assets.drivers.gcs import GCSStorageDriver, GCSStorageDriverSettings
-
-    has_gcs = True
-except ModuleNotFoundError:
-    has_gcs = False
 from modelkit.assets.drivers.local import LocalStorageDriver, LocalStorageDriverSettings
+from modelkit.assets.settings import AssetSpec
+from modelkit.utils.logging import ContextualizedLogging
 
 try:
-    from modelkit.assets.drivers.s3 import S3StorageDriver, S3StorageDriverSettings
+    import msgspec
 
-    has_s3 = True
-except ModuleNotFoundError:
-    has_s3 = False
-from modelkit.assets.settings import AssetSpec
-from modelkit.utils.logging import ContextualizedLogging
+    _META_DECODER = msgspec.json.Decoder(Dict[str, Any])
+    has_msgspec = True
+except ModuleNotFoundError:  # pragma: no cover
+    has_msgspec = False
 
 logger = get_logger(__name__)
 
+# number of parts of a multi-part asset that are uploaded concurrently
+PUSH_MAX_WORKERS = 8
+
 
 def get_size(dir_path):
     if os.path.isfile(dir_path):
@@ -88,33 +78,52 @@ class StorageProvider:
         self.force_download = force_download or bool(
             os.environ.get("MODELKIT_STORAGE_FORCE_DOWNLOAD")
         )
+        # pushed assets cannot be overwritten, so their meta never changes
+        self._meta_cache: Dict[Tuple[str, str], Dict[str, Any]] = {}
 
         provider = provider or os.environ.get("MODELKIT_STORAGE_PROVIDER")
         if not provider:
             raise NoConfiguredProviderError()
 
+        # the cloud SDKs are slow to import, the remote drivers are only imported
+        # when they are used
         if provider == "gcs":
-            if not has_gcs:
+            try:
+                from modelkit.assets.drivers.gcs import (
+                    GCSStorageDriver,
+                    GCSStorageDriverSettings,
+                )
+            except ModuleNotFoundError as e:
                 raise DriverNotInstalledError(
                     "GCS driver not installed, install modelkit[assets-gcs]"
-                )
+                ) from e
             gcs_driver_settings = GCSStorageDriverSettings(**driver_settings)
             self.driver = GCSStorageDriver(gcs_driver_settings, client)
         elif provider == "s3":
-            if not has_s3:
+            try:
+                from modelkit.assets.drivers.s3 import (
+                    S3StorageDriver,
+                    S3StorageDriverSettings,
+                )
+            except ModuleNotFoundError as e:
                 raise DriverNotInstalledError(
                     "S3 driver not installed, install modelkit[assets-s3]"
-                )
+                ) from e
             s3_driver_settings = S3StorageDriverSettings(**driver_settings)
             self.driver = S3StorageDriver(s3_driver_settings, client)
         elif provider == "local":
             local_driver_settings = LocalStorageDriverSettings(**driver_settings)
             self.driver = LocalStorageDriver(local_driver_settings)
         elif provider == "az":
-            if not has_az:
+            try:
+                from modelkit.assets.drivers.azure import (
+                    AzureStorageDriver,
+                    AzureStorageDriverSettings,
+                )
+            except ModuleNotFoundError as e:
                 raise DriverNotInstalledError(
                     "Azure driver not installed, install modelkit[assets-az]"
-                )
+                ) from e
             az_driver_settings = AzureStorageDriverSettings(**driver_settings)
             self.driver = AzureStorageDriver(az_driver_settings, client)
         else:
@@ -146,14 +155,17 @@ class StorageProvider:
         """
         Retrieve asset metadata
         """
-        meta_object_name = self.get_meta_object_name(name, version)
-        with tempfile.TemporaryDirectory() as tempdir:
-            fdst = os.path.join(tempdir, "meta.tmp")
-            self.driver.download_object(meta_object_name, fdst)
-            with open(fdst) as f:
-                meta = json.load(f)
-            meta["push_date"] = parser.isoparse(meta["push_date"])
-        return meta
+        meta = self._meta_cache.get((name, version))
+        if meta is None:
+            meta_object_name = self.get_meta_object_name(name, version)
+            with tempfile.TemporaryDirectory() as tempdir:
+                fdst = os.path.join(tempdir, "meta.tmp")
+                self.driver.download_object(meta_object_name, fdst)
+                meta = _load_meta(fdst)
+                meta["push_date"] = parser.isoparse(meta["push_date"])
+            self._meta_cache[(name, version)] = meta
+        # the meta holds mutable values (e.g. the contents list)
+        return copy.deepcopy(meta)
 
     def new(self, asset_path: str, name: str, version: str, dry_run=False):
         """
@@ -241,23 +253,37 @@ class StorageProvider:
                     "Pushing multi-part asset file",
                     n_parts=len(meta["contents"]),
                 )
-                for part_no, part in enumerate(meta["contents"]):
-                    path_to_push = os.path.join(asset_path, part)
-                    remote_object_name = "/".join(
-                        x
-                        for x in object_name.split("/") + list(os.path.split(part))
-                        if x
-                    )
-                    logger.debug(
-                        "Pushing multi-part asset file",
-                        object_name=remote_object_name,
-                        path_to_push=path_to_push,
-                        part=part,
-                        part_no=part_no,
-                        n_parts=len(meta["contents"]),
-                    )
-                    if not dry_run:
-                        self.driver.upload_object(path_to_push, remote_object_name)
+                # parts are independent objects, upload them concurrently so that
+                # remote drivers do not pay one round trip per part in series
+                with concurrent.futures.ThreadPoolExecutor(
+                    max_workers=PUSH_MAX_WORKERS
+                ) as executor:
+                    futures = []
+                    for part_no, part in enumerate(meta["contents"]):
+                        path_to_push = os.path.join(asset_path, part)
+                        remote_object_name = "/".join(
+                            x
+                            for x in object_name.split("/") + list(os.path.split(part))
+                            if x
+                        )
+                        logger.debug(
+                            "Pushing multi-part asset file",
+                            object_name=remote_object_name,
+                            path_to_push=path_to_push,
+                            part=part,
+                            part_no=part_no,
+                            n_parts=len(meta["contents"]),
+                        )
+                        if not dry_run:
+                            futures.append(
+                                executor.submit(
+                                    self.driver.upload_object,
+                                    path_to_push,
+                                    remote_object_name,
+                                )
+                            )
+                    for future in futures:
+                        future.result()
                 logger.info(
                     "Pushed multi-part asset file",
                     n_parts=len(meta["contents"]),
@@ -361,3 +387,13 @@ class StorageProvider:
         for asset_name in sorted(assets_set):
             versions_list = self.get_versions_info(asset_name)
             yield (asset_name, versions_list)
+
+
+def _load_meta(path: str) -> Dict[str, Any]:
+    # meta files are read on each asset download, msgspec decodes them faster
+    # than the json module when it is installed
+    if has_msgspec:
+        with open(path, "rb") as f:
+            return _META_DECODER.decode(f.read())
+    with open(path) as f:
+        return json.load(f)
@@ -1,5 +1,7 @@
+import functools
 import os
 import re
+import sys
 import typing
 
 from modelkit.assets import errors
@@ -18,9 +20,49 @@ REMOTE_ASSET_RE = (
     rf"(:{GENERIC_ASSET_VERSION_RE})?"
     rf"(\[(?P<sub_part>(\/?{GENERIC_ASSET_NAME_RE})+)\])?$"
 )
+_REMOTE_ASSET_PATTERN = re.compile(REMOTE_ASSET_RE)
+_ASSET_NAME_PATTERN = re.compile(GENERIC_ASSET_NAME_RE)
+_ASSET_VERSION_PATTERN = re.compile(GENERIC_ASSET_VERSION_RE)
+
+# the versioning systems only have class methods, all the specs share them
+_VERSIONING_SYSTEMS: typing.Dict[str, AssetsVersioningSystem] = {
+    "major_minor": MajorMinorAssetsVersioningSystem(),
+    "simple_date": SimpleDateAssetsVersioningSystem(),
+}
+
+
+# the same few asset names and specs are parsed over and over, e.g. on each
+# fetch_asset call, the results are cached by string
+
+
+@functools.lru_cache(maxsize=2048)
+def _is_name_valid(name: str) -> bool:
+    return _ASSET_NAME_PATTERN.fullmatch(name) is not None
+
+
+@functools.lru_cache(maxsize=2048)
+def _is_version_valid(version: str) -> bool:
+    return _ASSET_VERSION_PATTERN.fullmatch(version) is not None
+
+
+@functools.lru_cache(maxsize=1024)
+def _parse_asset_string(
+    input_string: str,
+) -> typing.Optional[typing.Tuple[str, typing.Optional[str], typing.Optional[str]]]:
+    match = _REMOTE_ASSET_PATTERN.match(input_string)
+    if not match:
+        return None
+    # specs of different versions of an asset share the same name string
+    return sys.intern(match["name"]), match["version"], match["sub_part"]
 
 
 class AssetSpec:
+    # one AssetSpec is created per fetched asset, so they do not carry a __dict__
+    __slots__ = ("name", "version", "sub_part", "versioning")
+
+    name: str
+    version: typing.Optional[str]
+    sub_part: typing.Optional[str]
     versioning: AssetsVersioningSystem
 
     def __init__(
@@ -30,25 +72,33 @@ class AssetSpec:
         version: typing.Optional[str] = None,
         sub_part: typing.Optional[str] = None,
     ) -> None:
+        self._set_versioning(versioning)
+        self.check_name_valid(name)
+        if version:
+            self.check_version_valid(version)
+        self._set_parts(name, version, sub_part)
+
+    def _set_versioning(self, versioning: typing.Optional[str]) -> None:
         versioning = (
             versioning
             or os.environ.get("MODELKIT_ASSETS_VERSIONING_SYSTEM")
             or "major_minor"
         )
 
-        if versioning == "major_minor":
-            self.versioning = MajorMinorAssetsVersioningSystem()
-        elif versioning == "simple_date":
-            self.versioning = SimpleDateAssetsVersioningSystem()
-        else:
+        versioning_system = _VERSIONING_SYSTEMS.get(versioning)
+        if versioning_system is None:
             raise errors.UnknownAssetsVersioningSystemError(versioning)
+        self.versioning = versioning_system
 
-        self.check_name_valid(name)
-        self.name = name
+    def _set_parts(
+        self,
+        name: str,
+        version: typing.Optional[str],
+        sub_part: typing.Optional[str],
+    ) -> None:
         if version:
-            self.check_version_valid(version)
             self.versioning.check_version_valid(version)
-
+        self.name = name
         self.version = version
         self.sub_part = sub_part
 
@@ -82,14 +132,14 @@ class AssetSpec:
 
     @classmethod
     def check_name_valid(cls, name: str):
-        if not re.fullmatch(GENERIC_ASSET_NAME_RE, name):
+        if not _is_name_valid(name):
             raise errors.InvalidNameError(
                 f"Invalid name `{name}`, can only contain [a-z], [0-9], [/], [-] or [_]"
             )
 
     @classmethod
     def check_version_valid(cls, name: str):
-        if name and not re.fullmatch(GENERIC_ASSET_VERSION_RE, name):
+        if name and not _is_version_valid(name):
             raise errors.InvalidVersionError(
                 f"Invalid version `{name}`, can only contain [a-zA-Z0-9], [-._]"
             )
@@ -99,11 +149,16 @@ class AssetSpec:
         input_string: str,
         versioning: typing.Optional[str] = None,
     ):
-        match = re.match(REMOTE_ASSET_RE, input_string)
-        if not match:
+        parts = _parse_asset_string(input_string)
+        if not parts:
             raise errors.InvalidAssetSpecError(input_string)
 
-        return AssetSpec(versioning=versioning, **match.groupdict())
+        # the match already checked the name and version formats, only the
+        # versioning system checks remain
+        spec = AssetSpec.__new__(AssetSpec)
+        spec._set_versioning(versioning)
+        spec._set_parts(*parts)
+        return spec
 
     def __eq__(self, other):
         if not isinstance(other, AssetSpec):
@@ -5,6 +5,8 @@ from modelkit.assets import errors
 from modelkit.assets.versioning import versioning
 
 MAJOR_MINOR_VERSION_RE = r"(?P<major>[0-9]+)(\.(?P<minor>[0-9]+))?"
+_MAJOR_MINOR_VERSION_PATTERN = re.compile(MAJOR_MINOR_VERSION_RE)
+_VERSION_NUMBER_PATTERN = re.compile("[0-9]+")
 
 
 class InvalidMajorVersionError(errors.InvalidVersionError):
@@ -94,14 +96,14 @@ class MajorMinorAssetsVersioningSystem(versioning.AssetsVersioningSystem):
 
     @staticmethod
     def _check_version_number(minor_or_major):
-        if minor_or_major and not re.fullmatch("^[0-9]+$", minor_or_major):
+        if minor_or_major and not _VERSION_NUMBER_PATTERN.fullmatch(minor_or_major):
             raise errors.InvalidVersionError(
                 f"Invalid version `{minor_or_major}` is not a number"
             )
 
     @staticmethod
     def _parse_version_str(version: str):
-        m = re.fullmatch(MAJOR_MINOR_VERSION_RE, version)
+        m = _MAJOR_MINOR_VERSION_PATTERN.fullmatch(version)
         if not m:
             raise errors.InvalidVersionError(version)
         d = m.groupdict()
@@ -138,7 +140,7 @@ class MajorMinorAssetsVersioningSystem(versioning.AssetsVersioningSystem):
 
     @staticmethod
     def filter_versions(version_list, major):
-        if not re.fullmatch("[0-9]+", major):
+        if not _VERSION_NUMBER_PATTERN.fullmatch(major):
             raise InvalidMajorVersionError(major)
         return [v for v in version_list if re.match(f"^{major}" + r".", v)]
 
@@ -6,6 +6,7 @@ from modelkit.assets import errors
 from modelkit.assets.versioning import versioning
 
 DATE_RE = r"^\d{4}-\d{2}-\d{2}T\d{2}-\d{2}-\d{2}Z$"
+_DATE_PATTERN = re.compile(DATE_RE)
 
 
 class SimpleDateAssetsVersioningSystem(versioning.AssetsVersioningSystem):
@@ -15,7 +16,7 @@ class SimpleDateAssetsVersioningSystem(versioning.AssetsVersioningSystem):
 
     @classmethod
     def check_version_valid(cls, version: str):
-        if not re.fullmatch(DATE_RE, version):
+        if not _DATE_PATTERN.fullmatch(version):
             raise errors.InvalidVersionError(f"Invalid version `{version}`")
 
     @classmethod
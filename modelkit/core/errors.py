@@ -3,7 +3,7 @@ import inspect
 import os
 import traceback
 import types
-from typing import Any, Callable, Optional, TypeVar, cast
+from typing import Any, Callable, Dict, Optional, TypeVar, cast
 
 import pydantic
 
@@ -74,18 +74,31 @@ class ItemValidationException(ModelkitDataValidationException):
         )
 
 
+_INTERNAL_FILENAMES: Dict[str, bool] = {}
+
+
 def is_modelkit_internal_frame(frame: types.FrameType):
     """
     Guess whether the frame originates from a submodule of `modelkit`
+
+    The result only depends on the frame's file, and is memoized per filename since
+    looking up its module walks `sys.modules`.
     """
+    filename = frame.f_code.co_filename
+    try:
+        return _INTERNAL_FILENAMES[filename]
+    except KeyError:
+        pass
+    internal = False
     try:
         mod = inspect.getmodule(frame)
         if mod:
             frame_package = __package__.split(".")[0]
-            return frame_package == "modelkit"
+            internal = frame_package == "modelkit"
     except BaseException:
         pass
-    return False
+    _INTERNAL_FILENAMES[filename] = internal
+    return internal
 
 
 def strip_modelkit_traceback_frames(exc: BaseException):
@@ -93,13 +106,37 @@ def strip_modelkit_traceback_frames(exc: BaseException):
     Walk the traceback and remove frames that originate from within modelkit
     Return an exception with the filtered traceback
     """
+    frames = [
+        tb_frame
+        for tb_frame, _ in traceback.walk_tb(exc.__traceback__)
+        if not is_modelkit_internal_frame(tb_frame)
+    ]
     tb = None
-    for tb_frame, _ in reversed(list(traceback.walk_tb(exc.__traceback__))):
-        if not is_modelkit_internal_frame(tb_frame):
-            tb = types.TracebackType(tb, tb_frame, tb_frame.f_lasti, tb_frame.f_lineno)
+    for tb_frame in reversed(frames):
+        tb = types.TracebackType(tb, tb_frame, tb_frame.f_lasti, tb_frame.f_lineno)
     return exc.with_traceback(tb)
 
 
+def simple_traceback_from_env() -> bool:
+    return os.environ.get("MODELKIT_ENABLE_SIMPLE_TRACEBACK", "True").lower() in {
+        "1",
+        "true",
+        "yes",
+    }
+
+
+# Read once at import, use `set_simple_traceback` to change it afterwards
+ENABLE_SIMPLE_TRACEBACK = simple_traceback_from_env()
+
+
+def set_simple_traceback(enable: bool) -> None:
+    """
+    Toggle the removal of modelkit frames from prediction tracebacks
+    """
+    global ENABLE_SIMPLE_TRACEBACK
+    ENABLE_SIMPLE_TRACEBACK = enable
+
+
 T = TypeVar("T", bound=Callable[..., Any])
 
 
@@ -113,7 +150,7 @@ def wrap_modelkit_exceptions(func: T) -> T:
             try:
                 return func(*args, **kwargs)
             except PredictionError as exc:
-                if os.environ.get("MODELKIT_ENABLE_SIMPLE_TRACEBACK", "True") == "True":
+                if ENABLE_SIMPLE_TRACEBACK:
                     raise strip_modelkit_traceback_frames(exc.exc) from exc
                 raise exc.exc from exc
             except BaseException:
@@ -131,7 +168,7 @@ def wrap_modelkit_exceptions_gen(func: T) -> T:
             try:
                 yield from func(*args, **kwargs)
             except PredictionError as exc:
-                if os.environ.get("MODELKIT_ENABLE_SIMPLE_TRACEBACK", "True") == "True":
+                if ENABLE_SIMPLE_TRACEBACK:
                     raise strip_modelkit_traceback_frames(exc.exc) from exc
                 raise exc.exc from exc
             except BaseException:
@@ -149,7 +186,7 @@ def wrap_modelkit_exceptions_async(func: T) -> T:
             try:
                 return await func(*args, **kwargs)
             except PredictionError as exc:
-                if os.environ.get("MODELKIT_ENABLE_SIMPLE_TRACEBACK", "True") == "True":
+                if ENABLE_SIMPLE_TRACEBACK:
                     raise strip_modelkit_traceback_frames(exc.exc) from exc
                 raise exc.exc from exc
             except BaseException:
@@ -169,7 +206,7 @@ def wrap_modelkit_exceptions_gen_async(func: T) -> T:
                 async for x in func(*args, **kwargs):
                     yield x
             except PredictionError as exc:
-                if os.environ.get("MODELKIT_ENABLE_SIMPLE_TRACEBACK", "True") == "True":
+                if ENABLE_SIMPLE_TRACEBACK:
                     raise strip_modelkit_traceback_frames(exc.exc) from exc
                 raise exc.exc from exc
             except BaseException:
@@ -4,6 +4,7 @@ ModelLibrary
 Ask for model using get. Handle loading, refresh...
 """
 import collections
+import logging
 import os
 import re
 from typing import (
@@ -37,6 +38,7 @@ from modelkit.core.model_configuration import ModelConfiguration, configure, lis
 from modelkit.core.settings import LibrarySettings, NativeCacheSettings, RedisSettings
 from modelkit.core.types import LibraryModelsType
 from modelkit.utils.cache import Cache, NativeCache, RedisCache
+from modelkit.utils.logging import is_enabled_for
 from modelkit.utils.memory import PerformanceTracker
 from modelkit.utils.pretty import describe
 from modelkit.utils.redis import RedisCacheException
@@ -105,7 +107,9 @@ class ModelLibrary:
             if isinstance(self.settings.cache, RedisSettings):
                 try:
                     self.cache = RedisCache(
-                        self.settings.cache.host, self.settings.cache.port
+                        self.settings.cache.host,
+                        self.settings.cache.port,
+                        model_keys=self.configuration,
                     )
                 except (ConnectionError, redis.ConnectionError) as e:
                     logger.error(
@@ -189,16 +193,17 @@ class ModelLibrary:
             self._check_configurations(model_name)
             self._resolve_assets(model_name)
             self._load_model(model_name)
-        logger.info(
-            "Model and dependencies loaded",
-            name=model_name,
-            time=humanize.naturaldelta(m.time, minimum_unit="seconds"),
-            time_s=m.time,
-            memory=humanize.naturalsize(m.increment)
-            if m.increment is not None
-            else None,
-            memory_bytes=m.increment,
-        )
+        if is_enabled_for(logger, logging.INFO):
+            logger.info(
+                "Model and dependencies loaded",
+                name=model_name,
+                time=humanize.naturaldelta(m.time, minimum_unit="seconds"),
+                time_s=m.time,
+                memory=humanize.naturalsize(m.increment)
+                if m.increment is not None
+                else None,
+                memory_bytes=m.increment,
+            )
 
     def _check_configurations(self, configuration_key):
         if configuration_key not in self.configuration:
@@ -3,6 +3,7 @@ import copy
 import datetime as dt
 import enum
 import functools
+import logging
 import typing
 from contextlib import ExitStack
 from typing import (
@@ -34,6 +35,7 @@ from modelkit.core import errors
 from modelkit.core.settings import LibrarySettings
 from modelkit.core.types import ItemType, ReturnType, TestCase
 from modelkit.utils.cache import Cache, CacheItem
+from modelkit.utils.logging import is_enabled_for
 from modelkit.utils.memory import PerformanceTracker
 from modelkit.utils.pretty import describe, pretty_print_type
 
@@ -159,16 +161,17 @@ class Asset:
         with PerformanceTracker() as m:
             self._load()
 
-        logger.debug(
-            "Model loaded",
-            model_name=self.configuration_key,
-            time=humanize.naturaldelta(m.time, minimum_unit="seconds"),
-            time_s=m.time,
-            memory=humanize.naturalsize(m.increment)
-            if m.increment is not None
-            else None,
-            memory_bytes=m.increment,
-        )
+        if is_enabled_for(logger, logging.DEBUG):
+            logger.debug(
+                "Model loaded",
+                model_name=self.configuration_key,
+                time=humanize.naturaldelta(m.time, minimum_unit="seconds"),
+                time_s=m.time,
+                memory=humanize.naturalsize(m.increment)
+                if m.increment is not None
+                else None,
+                memory_bytes=m.increment,
+            )
         self._loaded = True
         self._load_time = m.time
         self._load_memory_increment = m.increment
@@ -217,6 +220,8 @@ class AbstractModel(Asset, Generic[ItemType, ReturnType]):
         super().__init__(**kwargs)
         self.initialize_validation_models()
         self._check_is_overriden()
+        if self.cache and self.configuration_key:
+            self.cache.register_return_type(self.configuration_key, self._return_type)
 
     def initialize_validation_models(self):
         try:
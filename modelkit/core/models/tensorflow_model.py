@@ -1,17 +1,16 @@
 import abc
+import itertools
 import json
 import os
-from typing import Any, Dict, List, Optional, Tuple, Type
+import queue
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type, TypeVar
 
 import aiohttp
 import requests
 from structlog import get_logger
-from tenacity import (
-    Retrying,
-    retry_if_exception,
-    stop_after_attempt,
-    wait_random_exponential,
-)
 
 from modelkit.core.model import AsyncModel, Model
 from modelkit.core.types import ItemType, ReturnType
@@ -30,14 +29,34 @@ except ModuleNotFoundError:  # pragma: no cover
     has_tensorflow = False
     logger.info("tensorflow is not installed")
 
-try:
-    import grpc
-    from tensorflow_serving.apis import prediction_service_pb2_grpc
-    from tensorflow_serving.apis.get_model_metadata_pb2 import GetModelMetadataRequest
-    from tensorflow_serving.apis.predict_pb2 import PredictRequest
+# grpc and the TF serving API are slow to import and only used in gRPC mode,
+# they are imported by `_ensure_grpc` on first use
+grpc: Any = None
+prediction_service_pb2_grpc: Any = None
+GetModelMetadataRequest: Any = None
+PredictRequest: Any = None
 
-except ModuleNotFoundError:  # pragma: no cover
-    logger.info("Tensorflow serving is not installed")
+
+def _ensure_grpc() -> None:
+    global grpc, prediction_service_pb2_grpc, GetModelMetadataRequest, PredictRequest
+    if PredictRequest is not None:
+        return
+    try:
+        import grpc as _grpc
+        from tensorflow_serving.apis import prediction_service_pb2_grpc as _pb2_grpc
+        from tensorflow_serving.apis.get_model_metadata_pb2 import (
+            GetModelMetadataRequest as _GetModelMetadataRequest,
+        )
+        from tensorflow_serving.apis.predict_pb2 import (
+            PredictRequest as _PredictRequest,
+        )
+    except ModuleNotFoundError:  # pragma: no cover
+        logger.info("Tensorflow serving is not installed")
+        raise
+    grpc = _grpc
+    prediction_service_pb2_grpc = _pb2_grpc
+    GetModelMetadataRequest = _GetModelMetadataRequest
+    PredictRequest = _PredictRequest
 
 
 try:
@@ -119,10 +138,11 @@ class TensorflowModel(TensorflowModelMixin, Model[ItemType, ReturnType]):
             or self.configuration_key
         )
 
-        # the GRPC stub
+        # the GRPC stub, and the pool of channels that predictions are sent through
         self.grpc_stub: Optional[
-            prediction_service_pb2_grpc.PredictionServiceStub
+            "prediction_service_pb2_grpc.PredictionServiceStub"
         ] = None
+        self.grpc_channel_pool: Optional[GRPCChannelPool] = None
 
         # the session (for use with TF as an API)
         self.session = None
@@ -135,6 +155,11 @@ class TensorflowModel(TensorflowModelMixin, Model[ItemType, ReturnType]):
                 self.service_settings.tf_serving.port,
                 self.service_settings.tf_serving.mode,
             )
+            if self.service_settings.tf_serving.mode == "grpc":
+                self.grpc_channel_pool = acquire_grpc_channel_pool(
+                    self.service_settings.tf_serving.host,
+                    self.service_settings.tf_serving.port,
+                )
         else:
             self.saved_model = tf.saved_model.load(os.path.join(self.asset_path, "1"))
             self.tf_model_signature = self.saved_model.signatures[
@@ -174,20 +199,41 @@ class TensorflowModel(TensorflowModelMixin, Model[ItemType, ReturnType]):
     def _tensorflow_predict_grpc(
         self, vects: Dict[str, "np.ndarray"], dtype=None
     ) -> Dict[str, "np.ndarray"]:
+        _ensure_grpc()
         request = PredictRequest()
         request.model_spec.name = self.tf_model_name
         for key, vect in vects.items():
             request.inputs[key].CopyFrom(
                 tf.compat.v1.make_tensor_proto(vect, dtype=dtype)
             )
-        if not self.grpc_stub:
+        if (
+            not self.grpc_stub
+            or not self.grpc_channel_pool
+            or self.grpc_channel_pool.closed
+        ):
+            # the pool may have been closed after another model evicted it
+            self._release_grpc_channel_pool()
             self.grpc_stub = connect_tf_serving_grpc(
                 self.tf_model_name,
                 self.service_settings.tf_serving.host,
                 self.service_settings.tf_serving.port,
             )
+            self.grpc_channel_pool = acquire_grpc_channel_pool(
+                self.service_settings.tf_serving.host,
+                self.service_settings.tf_serving.port,
+            )
 
-        r = self.grpc_stub.Predict(request, 1)
+        try:
+            r = self.grpc_channel_pool.predict(request, 1)
+        except grpc.RpcError as exc:
+            if exc.code() == grpc.StatusCode.UNAVAILABLE:
+                # drop the broken connections, the next call will reconnect
+                self._release_grpc_channel_pool()
+                evict_grpc_channel_pool(
+                    self.service_settings.tf_serving.host,
+                    self.service_settings.tf_serving.port,
+                )
+            raise
 
         return {
             output_key: np.array(
@@ -274,7 +320,14 @@ class TensorflowModel(TensorflowModelMixin, Model[ItemType, ReturnType]):
 
         return KerasModelFromSavedModel(self.tf_model_signature)
 
+    def _release_grpc_channel_pool(self):
+        if self.grpc_channel_pool:
+            release_grpc_channel_pool(self.grpc_channel_pool)
+        self.grpc_stub = None
+        self.grpc_channel_pool = None
+
     def close(self):
+        self._release_grpc_channel_pool()
         if self.requests_session:
             return self.requests_session.close()
 
@@ -344,9 +397,9 @@ class AsyncTensorflowModel(TensorflowModelMixin, AsyncModel[ItemType, ReturnType
             f"/v1/models/{self.tf_model_name}:predict",
             data=json.dumps({"inputs": vects}, default=safe_np_dump),
         ) as response:
-            if response.status != 200:  # pragma: no cover
+            if response.status != 200:
                 raise TFServingError(
-                    f"TF Serving error [{response.reason}]: {response.text}"
+                    f"TF Serving error [{response.reason}]: {await response.text()}"
                 )
             response_json = await response.json()
         outputs = response_json["outputs"]
@@ -370,66 +423,347 @@ class TFServingError(Exception):
     pass
 
 
-def log_after_retry(name):
-    return lambda retry_state: logger.info(
-        "Retrying TF serving connection",
-        name=name,
-        attempt_number=retry_state.attempt_number,
-        wait_time=retry_state.outcome_timestamp - retry_state.start_time,
-    )
+T = TypeVar("T")
+
+
+def retry_tf_serving(name: str, fn: Callable[[], T]) -> T:
+    """Call `fn` until it succeeds, at most MODELKIT_TF_SERVING_ATTEMPTS times,
+    waiting a random delay between attempts, of at most 1, 2, 4... seconds,
+    capped at 20s. The last exception is reraised.
+    """
+    attempts = int(os.environ.get("MODELKIT_TF_SERVING_ATTEMPTS", 10))
+    start = time.monotonic()
+    attempt_number = 1
+    while True:
+        try:
+            return fn()
+        except Exception:
+            if attempt_number >= attempts:
+                raise
+        logger.info(
+            "Retrying TF serving connection",
+            name=name,
+            attempt_number=attempt_number,
+            wait_time=time.monotonic() - start,
+        )
+        time.sleep(random.uniform(0, min(2 ** (attempt_number - 1), 20)))
+        attempt_number += 1
 
 
-def retriable_error(exception):
-    return isinstance(exception, Exception)
+GRPC_COMPRESSIONS = {"deflate": "Deflate", "gzip": "Gzip"}
+# smaller requests are not worth compressing
+GRPC_COMPRESSION_MIN_BYTES = 64 * 1024
 
 
-def tf_serving_retry_policy(name):
-    return {
-        "wait": wait_random_exponential(
-            multiplier=1,
-            min=4,
-            max=20,
+def grpc_channel_options() -> List[Tuple[str, Any]]:
+    max_message_length = int(
+        os.environ.get("MODELKIT_TF_SERVING_GRPC_MAX_MESSAGE_LENGTH", 256 * 1024 * 1024)
+    )
+    return [
+        ("grpc.lb_policy_name", "round_robin"),
+        # prevents channels from sharing their subchannels
+        # (and therefore their connections)
+        ("grpc.use_local_subchannel_pool", 1),
+        # keep idle connections alive with HTTP/2 pings, so that they are not
+        # silently dropped between predictions.
+        # Servers reject pings more frequent than every 5 minutes by default
+        (
+            "grpc.keepalive_time_ms",
+            int(os.environ.get("MODELKIT_TF_SERVING_GRPC_KEEPALIVE_TIME_MS", 300000)),
         ),
-        "stop": stop_after_attempt(
-            int(os.environ.get("MODELKIT_TF_SERVING_ATTEMPTS", 10))
+        (
+            "grpc.keepalive_timeout_ms",
+            int(os.environ.get("MODELKIT_TF_SERVING_GRPC_KEEPALIVE_TIMEOUT_MS", 20000)),
         ),
-        "retry": retry_if_exception(retriable_error),
-        "after": log_after_retry(name),
-        "reraise": True,
-    }
+        ("grpc.keepalive_permit_without_calls", 1),
+        ("grpc.http2.max_pings_without_data", 0),
+        # the default 4MB limit is too low for large output tensors
+        ("grpc.max_send_message_length", max_message_length),
+        ("grpc.max_receive_message_length", max_message_length),
+        ("grpc.enable_retries", 1),
+        ("grpc.service_config", grpc_service_config()),
+    ]
+
+
+def grpc_service_config() -> str:
+    """Let gRPC retry predictions refused by an unavailable server by itself,
+    on the same channel
+    """
+    # gRPC caps the number of attempts to 5
+    max_attempts = int(os.environ.get("MODELKIT_TF_SERVING_GRPC_MAX_ATTEMPTS", 5))
+    method_configs = []
+    if max_attempts > 1:
+        method_configs.append(
+            {
+                "name": [{"service": "tensorflow.serving.PredictionService"}],
+                "retryPolicy": {
+                    "maxAttempts": max_attempts,
+                    "initialBackoff": "0.05s",
+                    "maxBackoff": "1s",
+                    "backoffMultiplier": 2,
+                    "retryableStatusCodes": ["UNAVAILABLE"],
+                },
+            }
+        )
+    return json.dumps(
+        {
+            "loadBalancingConfig": [{"round_robin": {}}],
+            "methodConfig": method_configs,
+        }
+    )
+
+
+def grpc_compression() -> Optional["grpc.Compression"]:
+    _ensure_grpc()
+    compression = os.environ.get("MODELKIT_TF_SERVING_GRPC_COMPRESSION", "").lower()
+    if not compression or compression == "none":
+        return None
+    if compression not in GRPC_COMPRESSIONS:
+        raise ValueError(
+            f"Unknown gRPC compression `{compression}`, "
+            f"should be one of: none, {', '.join(GRPC_COMPRESSIONS)}"
+        )
+    return getattr(grpc.Compression, GRPC_COMPRESSIONS[compression])
+
+
+class PooledChannel:
+    __slots__ = ("channel", "stub", "created_at", "calls")
+
+    def __init__(self, target: str):
+        _ensure_grpc()
+        self.channel = grpc.insecure_channel(target, grpc_channel_options())
+        self.stub = prediction_service_pb2_grpc.PredictionServiceStub(self.channel)
+        self.created_at = time.monotonic()
+        self.calls = 0
+
+
+class GRPCChannelPool:
+    """A fixed set of gRPC channels to a TF serving instance, used in turn
+
+    All the streams of a channel are multiplexed on a single HTTP/2 connection,
+    spreading concurrent calls over several channels avoids them being limited
+    by a single connection.
+    Channels are renewed after a given age or number of calls, so that
+    the TF serving host is resolved again from time to time.
+    """
+
+    def __init__(self, host, port, size: int):
+        self.host = host
+        self.port = port
+        self.target = f"{host}:{port}"
+        self.entries = [PooledChannel(self.target) for _ in range(size)]
+        self.closed = False
+        # number of models holding the pool, it is closed when the last one
+        # releases it
+        self.users = 0
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self.compression = grpc_compression()
+        self.max_channel_age_s = float(
+            os.environ.get("MODELKIT_TF_SERVING_GRPC_MAX_CHANNEL_AGE_S", 300)
+        )
+        self.max_channel_calls = int(
+            os.environ.get("MODELKIT_TF_SERVING_GRPC_MAX_CHANNEL_CALLS", 100_000)
+        )
+        # when set, a second request is sent if the first one did not answer
+        # within this delay, and the first response is used
+        self.hedge_delay_s = (
+            float(os.environ.get("MODELKIT_TF_SERVING_GRPC_HEDGE_DELAY_MS", 0)) / 1000
+        )
+
+    @property
+    def stubs(self) -> List["prediction_service_pb2_grpc.PredictionServiceStub"]:
+        return [entry.stub for entry in self.entries]
+
+    def next_stub(self) -> "prediction_service_pb2_grpc.PredictionServiceStub":
+        index = next(self._counter) % len(self.entries)
+        entry = self.entries[index]
+        entry.calls += 1
+        if (
+            entry.calls > self.max_channel_calls
+            or time.monotonic() - entry.created_at > self.max_channel_age_s
+        ):
+            with self._lock:
+                if self.entries[index] is entry:
+                    # the previous channel is not closed since calls may still
+                    # be running on it, it is closed once garbage collected
+                    self.entries[index] = PooledChannel(self.target)
+                entry = self.entries[index]
+        return entry.stub
+
+    def compression_for(self, request) -> Optional["grpc.Compression"]:
+        if self.compression is None or (
+            request.ByteSize() < GRPC_COMPRESSION_MIN_BYTES
+        ):
+            return None
+        return self.compression
+
+    def predict(self, request, timeout: float):
+        compression = self.compression_for(request)
+        if not self.hedge_delay_s:
+            return self.next_stub().Predict(request, timeout, compression=compression)
+        first = self.next_stub().Predict.future(
+            request, timeout, compression=compression
+        )
+        try:
+            return first.result(timeout=self.hedge_delay_s)
+        except grpc.FutureTimeoutError:
+            pass
+        # the hedged request goes through the next channel, and therefore
+        # another connection
+        hedge = self.next_stub().Predict.future(
+            request, timeout, compression=compression
+        )
+        done: queue.SimpleQueue = queue.SimpleQueue()
+        first.add_done_callback(done.put)
+        hedge.add_done_callback(done.put)
+        errors = []
+        for _ in range(2):
+            future = done.get()
+            if future.exception() is None:
+                (hedge if future is first else first).cancel()
+                return future.result()
+            errors.append(future.exception())
+        raise errors[0]
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        for entry in self.entries:
+            entry.channel.close()
+
+
+# channel pools are shared by all the models served by the same TF serving
+# instance, so that they reuse the same connections
+_GRPC_CHANNEL_POOLS: Dict[Tuple[str, int], GRPCChannelPool] = {}
+_GRPC_CHANNEL_POOLS_LOCK = threading.Lock()
+
+
+def _get_grpc_channel_pool(host, port) -> GRPCChannelPool:
+    # must be called with _GRPC_CHANNEL_POOLS_LOCK held
+    pool = _GRPC_CHANNEL_POOLS.get((host, port))
+    if pool is None:
+        pool = _GRPC_CHANNEL_POOLS[(host, port)] = GRPCChannelPool(
+            host,
+            port,
+            int(os.environ.get("MODELKIT_TF_SERVING_GRPC_POOL_SIZE", 4)),
+        )
+    return pool
+
+
+def get_grpc_channel_pool(host, port) -> GRPCChannelPool:
+    pool = _GRPC_CHANNEL_POOLS.get((host, port))
+    if pool is not None:
+        return pool
+    with _GRPC_CHANNEL_POOLS_LOCK:
+        return _get_grpc_channel_pool(host, port)
+
+
+def acquire_grpc_channel_pool(host, port) -> GRPCChannelPool:
+    """Get the channel pool to `host:port`, and keep it open until it is
+    released with `release_grpc_channel_pool`
+    """
+    with _GRPC_CHANNEL_POOLS_LOCK:
+        pool = _get_grpc_channel_pool(host, port)
+        pool.users += 1
+        return pool
+
+
+def release_grpc_channel_pool(pool: GRPCChannelPool) -> None:
+    """Release a pool acquired with `acquire_grpc_channel_pool`, it is
+    forgotten and its channels are closed once no model holds it anymore
+    """
+    with _GRPC_CHANNEL_POOLS_LOCK:
+        pool.users -= 1
+        if pool.users > 0:
+            return
+        if _GRPC_CHANNEL_POOLS.get((pool.host, pool.port)) is pool:
+            del _GRPC_CHANNEL_POOLS[(pool.host, pool.port)]
+    pool.close()
+
+
+def evict_grpc_channel_pool(host, port) -> None:
+    """Forget and close the channels to `host:port`, new ones are opened on
+    the next connection
+    """
+    with _GRPC_CHANNEL_POOLS_LOCK:
+        pool = _GRPC_CHANNEL_POOLS.pop((host, port), None)
+    if pool is not None:
+        pool.close()
+
+
+def close_grpc_channel_pools() -> None:
+    with _GRPC_CHANNEL_POOLS_LOCK:
+        pools = list(_GRPC_CHANNEL_POOLS.values())
+        _GRPC_CHANNEL_POOLS.clear()
+    for pool in pools:
+        pool.close()
 
 
 def connect_tf_serving_grpc(
     model_name, host, port
 ) -> "prediction_service_pb2_grpc.PredictionServiceStub":
+    _ensure_grpc()
+
+    def _connect():
+        stub = get_grpc_channel_pool(host, port).next_stub()
+        r = GetModelMetadataRequest()
+        r.model_spec.name = model_name
+        r.metadata_field.append("signature_def")
+        try:
+            answ = stub.GetModelMetadata(r, 1)
+        except grpc.RpcError:
+            evict_grpc_channel_pool(host, port)
+            raise
+        version = answ.model_spec.version.value
+        if version != 1:  # pragma: no cover
+            raise TFServingError(f"Bad model version: {version}!=1")
+        return stub
+
     try:
-        for attempt in Retrying(**tf_serving_retry_policy("tf-serving-grpc")):
-            with attempt:
-                channel = grpc.insecure_channel(
-                    f"{host}:{port}", [("grpc.lb_policy_name", "round_robin")]
-                )
-                stub = prediction_service_pb2_grpc.PredictionServiceStub(channel)
-                r = GetModelMetadataRequest()
-                r.model_spec.name = model_name
-                r.metadata_field.append("signature_def")
-                answ = stub.GetModelMetadata(r, 1)
-                version = answ.model_spec.version.value
-                if version != 1:  # pragma: no cover
-                    raise TFServingError(f"Bad model version: {version}!=1")
-                return stub
+        return retry_tf_serving("tf-serving-grpc", _connect)
     except grpc.RpcError:
         logger.error("Error connecting to TF serving")
         raise
 
 
+_REST_SESSION: Optional[requests.Session] = None
+
+
+def get_rest_session() -> requests.Session:
+    """A session shared by TF serving REST connection checks, which keeps its
+    connections open between calls"""
+    global _REST_SESSION
+    if _REST_SESSION is None:
+        session = requests.Session()
+        session.mount(
+            "http://",
+            requests.adapters.HTTPAdapter(
+                pool_connections=8, pool_maxsize=32, max_retries=0
+            ),
+        )
+        _REST_SESSION = session
+    return _REST_SESSION
+
+
 def connect_tf_serving_rest(model_name, host, port) -> None:
+    # a server that is slow to answer while warming up is retried as well
+    timeout = float(os.environ.get("MODELKIT_TF_SERVING_CONNECT_TIMEOUT_S", 1))
+
+    def _connect():
+        response = get_rest_session().get(
+            f"http://{host}:{port}/v1/models/{model_name}", timeout=timeout
+        )
+        if response.status_code != 200:  # pragma: no cover
+            raise TFServingError(
+                "Error connecting to TF serving "
+                f"[{response.status_code} {response.reason}]"
+            )
+
     try:
-        for attempt in Retrying(**tf_serving_retry_policy("tf-serving-rest")):
-            with attempt:
-                response = requests.get(f"http://{host}:{port}/v1/models/{model_name}")
-                if response.status_code != 200:  # pragma: no cover
-                    raise TFServingError("Error connecting to TF serving")
-    except requests.exceptions.ConnectionError:
+        retry_tf_serving("tf-serving-rest", _connect)
+    except requests.exceptions.RequestException:
         logger.error("Error connecting to TF serving")
         raise
 
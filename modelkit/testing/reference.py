@@ -2,20 +2,88 @@ import datetime
 import decimal
 import difflib
 import json
+import math
 import os
 import traceback
 from collections.abc import Iterable
-from typing import Any
+from typing import Any, Dict
+
+try:
+    import cdifflib
+
+    has_cdifflib = True
+except ModuleNotFoundError:  # pragma: no cover
+    has_cdifflib = False
+try:
+    import orjson
+
+    has_orjson = True
+except ModuleNotFoundError:  # pragma: no cover
+    has_orjson = False
+
+
+# above this number of lines, diffs are computed with cdifflib if it is installed
+LARGE_DIFF_LINES = 2000
+
+
+def _first_mismatch(ref_lines, lines):
+    for i, (ref_line, line) in enumerate(zip(ref_lines, lines)):
+        if ref_line != line:
+            return i
+    return min(len(ref_lines), len(lines))
+
+
+def _format_range(start, stop):
+    length = stop - start
+    if length == 1:
+        return str(start + 1)
+    return f"{start + 1 if length else start},{length}"
+
+
+def _unified_diff(a, b, fromfile, tofile, matcher_class=difflib.SequenceMatcher):
+    """Same output as difflib.unified_diff, with a configurable sequence matcher"""
+    yield f"--- {fromfile}\n"
+    yield f"+++ {tofile}\n"
+    for group in matcher_class(None, a, b).get_grouped_opcodes(3):
+        first, last = group[0], group[-1]
+        yield (
+            f"@@ -{_format_range(first[1], last[2])} "
+            f"+{_format_range(first[3], last[4])} @@\n"
+        )
+        for tag, i1, i2, j1, j2 in group:
+            if tag == "equal":
+                for line in a[i1:i2]:
+                    yield " " + line
+                continue
+            for line in a[i1:i2]:
+                yield "-" + line
+            for line in b[j1:j2]:
+                yield "+" + line
 
 
 def _diff_lines(ref_name, ref_lines, lines):
     if ref_lines == lines:
         return
-    diff = list(
-        difflib.unified_diff(ref_lines, lines, fromfile=ref_name, tofile="test output")
+    if has_cdifflib and max(len(ref_lines), len(lines)) >= LARGE_DIFF_LINES:
+        diff = "".join(
+            _unified_diff(
+                ref_lines,
+                lines,
+                fromfile=ref_name,
+                tofile="test output",
+                matcher_class=cdifflib.CSequenceMatcher,
+            )
+        )
+    else:
+        diff = "".join(
+            difflib.unified_diff(
+                ref_lines, lines, fromfile=ref_name, tofile="test output"
+            )
+        )
+    assert False, (
+        f"first mismatch at line {_first_mismatch(ref_lines, lines) + 1}"
+        f" ({len(ref_lines)} reference lines, {len(lines)} lines)\n{diff}"
     )
-    diff = "".join(diff)
-    assert False, diff
 
 
 def json_serializer(obj):
@@ -26,7 +94,7 @@ def json_serializer(obj):
     raise TypeError("Unexpected " + obj.__class__.__name__)
 
 
-DUMP_KWARGS = {
+DUMP_KWARGS: Dict[str, Any] = {
     "indent": 2,
     "sort_keys": True,
     "ensure_ascii": False,
@@ -34,9 +102,48 @@ DUMP_KWARGS = {
 }
 
 
+def _has_non_finite_floats(doc) -> bool:
+    stack = [doc]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, float):
+            if not math.isfinite(value):
+                return True
+        elif isinstance(value, dict):
+            stack.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            stack.extend(value)
+    return False
+
+
+def _dumps(doc) -> str:
+    """Serialize a document to compare it, with orjson when it is installed
+
+    Its output is only meant for comparisons, since floats are not formatted
+    as the stdlib does (e.g. `1e16` instead of `1e+16`).
+    """
+    if has_orjson:
+        try:
+            js = orjson.dumps(
+                doc,
+                default=json_serializer,
+                option=orjson.OPT_SORT_KEYS | orjson.OPT_INDENT_2,
+            ).decode()
+        except TypeError:
+            # documents orjson cannot encode (e.g. non-str keys, large ints, or
+            # values json_serializer rejects) go through the stdlib encoder
+            pass
+        else:
+            # orjson writes NaN and infinities as null, which would compare
+            # equal to None
+            if "null" not in js or not _has_non_finite_floats(doc):
+                return js
+    return json.dumps(doc, **DUMP_KWARGS)
+
+
 def _diff_entities(ref_name, ref_doc, doc):
-    ref_js = json.dumps(ref_doc, **DUMP_KWARGS)
-    js = json.dumps(doc, **DUMP_KWARGS)
+    ref_js = _dumps(ref_doc)
+    js = _dumps(doc)
     return _diff_lines(ref_name, ref_js.splitlines(True), js.splitlines(True))
 
 
@@ -112,18 +219,46 @@ def click_invoke(runner, cmd_fn, args, env=None):
     return res
 
 
+_CONTAINER = object()
+
+
 def deep_format_floats(obj, depth=5):
-    # case str, is container but should be returned as is
-    if isinstance(obj, str):
-        return obj
-    # deep recursive call for any container
-    elif isinstance(obj, dict):
-        return {k: deep_format_floats(v, depth) for k, v in obj.items()}
-    elif isinstance(obj, Iterable):
-        return type(obj)(deep_format_floats(v, depth) for v in obj)
-    # format float
-    elif isinstance(obj, float):
-        return ("{:." + str(depth) + "f}").format(obj)
-    # else, return as is
-    else:
-        return obj
+    fmt = f"{{:.{depth}f}}".format
+
+    def _format(value):
+        # scalars are handled before the (slow) Iterable check
+        if isinstance(value, float):
+            return fmt(value)
+        if value is None or isinstance(value, (str, int)):
+            return value
+        # any other container is rebuilt, except str which is returned as is
+        if isinstance(value, (dict, Iterable)):
+            return _CONTAINER
+        return value
+
+    def _children(value):
+        return iter(value.values() if isinstance(value, dict) else value)
+
+    formatted = _format(obj)
+    if formatted is not _CONTAINER:
+        return formatted
+    # walk containers with an explicit stack of (container, children iterator,
+    # formatted children) to avoid deep recursion
+    stack = [(obj, _children(obj), [])]
+    while True:
+        container, children, formatted_children = stack[-1]
+        for child in children:
+            formatted = _format(child)
+            if formatted is _CONTAINER:
+                stack.append((child, _children(child), []))
+                break
+            formatted_children.append(formatted)
+        else:
+            stack.pop()
+            if isinstance(container, dict):
+                formatted = dict(zip(container.keys(), formatted_children))
+            else:
+                formatted = type(container)(formatted_children)
+            if not stack:
+                return formatted
+            stack[-1][2].append(formatted)
@@ -29,7 +29,8 @@ def tf_serving_fixture(request, lib, tf_version, deployment="docker"):
 
     else:
         deploy_tf_models(lib, "local-docker", config_name="testing")
-        # kill previous tfserving container (if any)
+        # remove a container left by an interrupted session (if any), the
+        # container is otherwise removed when it is killed
         subprocess.call(
             ["docker", "rm", "-f", "modelkit-tfserving-tests"],
             stderr=subprocess.DEVNULL,
@@ -39,6 +40,7 @@ def tf_serving_fixture(request, lib, tf_version, deployment="docker"):
             [
                 "docker",
                 "run",
+                "--rm",
                 "--name",
                 "modelkit-tfserving-tests",
                 "--volume",
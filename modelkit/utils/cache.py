@@ -2,7 +2,7 @@ import abc
 import hashlib
 import pickle
 from dataclasses import dataclass
-from typing import Any, Dict, Generic, Optional
+from typing import Any, Dict, Generic, Iterable, Optional, Type
 
 import cachetools
 import cachetools.keys
@@ -10,15 +10,42 @@ import pydantic
 
 import modelkit
 from modelkit.core.types import ItemType
-from modelkit.utils.redis import connect_redis
+from modelkit.utils.redis import RedisCacheException, connect_redis
 
+try:
+    import msgspec
 
-@dataclass
+    has_msgspec = True
+except ModuleNotFoundError:  # pragma: no cover
+    has_msgspec = False
+
+# pickled payloads always start with the PROTO opcode (b"\x80"), so this tag
+# cannot be mistaken for a pickle
+MSGPACK_TAG = b"\x00msgpack"
+
+
+@dataclass(init=False)
 class CacheItem(Generic[ItemType]):
-    item: Optional[ItemType] = None
-    cache_key: Optional[bytes] = None
-    cache_value: Optional[Any] = None
-    missing: bool = True
+    # one CacheItem is created per predicted item, so they do not carry
+    # a __dict__ (dataclass(slots=True) is not available before python 3.10)
+    __slots__ = ("item", "cache_key", "cache_value", "missing")
+
+    item: Optional[ItemType]
+    cache_key: Optional[bytes]
+    cache_value: Optional[Any]
+    missing: bool
+
+    def __init__(
+        self,
+        item: Optional[ItemType] = None,
+        cache_key: Optional[bytes] = None,
+        cache_value: Optional[Any] = None,
+        missing: bool = True,
+    ):
+        self.item = item
+        self.cache_key = cache_key
+        self.cache_value = cache_value
+        self.missing = missing
 
 
 class Cache(abc.ABC):
@@ -38,17 +65,38 @@ class Cache(abc.ABC):
     def set(self, k: bytes, d: Any):  # pragma: no cover
         ...
 
+    def register_return_type(  # noqa: B027
+        self, model_key: str, return_type: Optional[Type]
+    ):
+        """Called by the models with the type of the predictions they cache"""
+
 
 class RedisCache(Cache):
-    def __init__(self, host, port):
+    def __init__(self, host, port, model_keys: Optional[Iterable[str]] = None):
         self.redis = connect_redis(host, port)
-        self.cache_keys = {}
+        # prefixes are precomputed for the model keys known in advance,
+        # others are added the first time they are hashed
+        self.cache_keys: Dict[str, bytes] = {
+            model_key: self._cache_key_prefix(model_key)
+            for model_key in model_keys or ()
+        }
+        # payloads that are not pickled are decoded back to the return type of
+        # the model that cached them
+        self.return_types: Dict[str, Type] = {}
+
+    def register_return_type(self, model_key: str, return_type: Optional[Type]):
+        if return_type is not None:
+            self.return_types[model_key] = return_type
+
+    @staticmethod
+    def _cache_key_prefix(model_key: str) -> bytes:
+        return (model_key + modelkit.__version__).encode()
 
     def hash_key(self, model_key: str, item: Any, kwargs: Dict[str, Any]):
-        cache_key = self.cache_keys.get(model_key)
-        if not cache_key:
-            self.cache_keys[model_key] = (model_key + modelkit.__version__).encode()
+        try:
             cache_key = self.cache_keys[model_key]
+        except KeyError:
+            cache_key = self.cache_keys[model_key] = self._cache_key_prefix(model_key)
         pickled = pickle.dumps((item, kwargs))  # nosec: only used to build a hash
         return hashlib.sha256(cache_key + pickled).digest()
 
@@ -57,13 +105,39 @@ class RedisCache(Cache):
         r = self.redis.get(cache_key)
         if r is None:
             return CacheItem(item, cache_key, None, True)
-        return CacheItem(item, cache_key, pickle.loads(r), False)
+        return CacheItem(
+            item, cache_key, self.loads(r, self.return_types.get(model_key)), False
+        )
 
     def set(self, k: bytes, d: Any):
+        self.redis.set(k, self.dumps(d))
+
+    @staticmethod
+    def dumps(d: Any) -> bytes:
+        if has_msgspec and isinstance(d, msgspec.Struct):
+            # like pydantic models below, structs are stored as builtin types
+            return MSGPACK_TAG + msgspec.msgpack.encode(d)
         if isinstance(d, pydantic.BaseModel):
-            self.redis.set(k, pickle.dumps(d.model_dump()))
-        else:
-            self.redis.set(k, pickle.dumps(d))
+            return pickle.dumps(d.model_dump())
+        return pickle.dumps(d)
+
+    @staticmethod
+    def loads(r: bytes, return_type: Optional[Type] = None) -> Any:
+        if r.startswith(MSGPACK_TAG):
+            if not has_msgspec:
+                raise RedisCacheException(
+                    "Cannot decode a cached msgspec payload, msgspec is not installed"
+                )
+            payload = r[len(MSGPACK_TAG) :]
+            if return_type is not None:
+                try:
+                    return msgspec.msgpack.decode(payload, type=return_type)
+                except (TypeError, msgspec.ValidationError):
+                    # msgspec cannot decode to this return type (e.g. a union
+                    # with pydantic models), the model validates the raw value
+                    pass
+            return msgspec.msgpack.decode(payload)
+        return pickle.loads(r)  # nosec: only reads values written by `set`
 
 
 class NativeCache(Cache):
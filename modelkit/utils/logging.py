@@ -1,6 +1,19 @@
+import logging
+
 from structlog import contextvars
 
 
+def is_enabled_for(logger, level: int = logging.DEBUG) -> bool:
+    """Whether `logger` will emit events at `level`, so that expensive
+    log fields can be skipped when they would be filtered out anyway."""
+    bound_logger = logger.bind()
+    # native structlog loggers expose `is_enabled_for`, stdlib ones `isEnabledFor`
+    check = getattr(bound_logger, "is_enabled_for", None) or getattr(
+        bound_logger, "isEnabledFor", None
+    )
+    return check is None or check(level)
+
+
 class ContextualizedLogging:
     def __init__(self, **kwargs):
         self._context = kwargs
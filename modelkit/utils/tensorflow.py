@@ -11,18 +11,21 @@ logger = get_logger(__name__)
 
 
 def write_config(destination, models, verbose=False):
+    parts = ["model_config_list: {\n"]
+    for m, pth in models.items():
+        parts.append(
+            "    config: {\n"
+            f'        name: "{m}", \n'
+            f'        base_path: "{pth}",\n'
+            '        model_platform: "tensorflow"\n'
+            "    },\n"
+        )
+    parts.append("}")
+    data = "".join(parts)
     with open(destination, "w") as f:
-        f.write("model_config_list: {\n")
-        for m, pth in models.items():
-            f.write("    config: {\n")
-            f.write(f'        name: "{m}", \n')
-            f.write(f'        base_path: "{pth}",\n')
-            f.write('        model_platform: "tensorflow"\n')
-            f.write("    },\n")
-        f.write("}")
+        f.write(data)
     if verbose:
-        with open(destination) as f:
-            print(f.read())
+        print(data)
 
 
 def deploy_tf_models(lib, mode, config_name="config", verbose=False):
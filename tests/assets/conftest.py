@@ -1,11 +1,21 @@
+import atexit
+import concurrent.futures
+import contextlib
 import os
+import secrets
+import socket
 import subprocess
-import uuid
+import time
 
+import boto3
+import botocore.config
 import pytest
 import requests
 import urllib3
+from azure.core.exceptions import ResourceExistsError
+from botocore.exceptions import ClientError
 from google.api_core.client_options import ClientOptions
+from google.api_core.exceptions import Conflict
 from google.auth.credentials import AnonymousCredentials
 from google.cloud import storage
 from tenacity import (
@@ -15,17 +25,156 @@ from tenacity import (
     wait_random_exponential,
 )
 
+from modelkit.assets.drivers.azure import AzureStorageDriver
+from modelkit.assets.drivers.gcs import GCSStorageDriver
+from modelkit.assets.drivers.s3 import S3StorageDriver
 from modelkit.assets.manager import AssetsManager
 from modelkit.assets.remote import StorageProvider
+from tests.conftest import skip_unless
 
-test_path = os.path.dirname(os.path.realpath(__file__))
+test_path = os.path.dirname(__file__)
 
+# each pytest-xdist worker (gw0, gw1...) runs its own storage emulators, on
+# their own ports
+XDIST_WORKER = os.environ.get("PYTEST_XDIST_WORKER", "gw0")
+PORT_OFFSET = 10 * int(XDIST_WORKER[2:])
+MINIO_PORT = 9000 + PORT_OFFSET
+GCS_PORT = 4443 + PORT_OFFSET
+AZURITE_PORT = 10000 + PORT_OFFSET
 
-def _delete_all_objects(mng):
-    for object_name in mng.storage_provider.driver.iterate_objects(
-        mng.storage_provider.prefix
-    ):
-        mng.storage_provider.driver.delete_object(object_name)
+DOCKER_COMPOSE = [
+    "docker",
+    "compose",
+    "--file",
+    os.path.join(test_path, "docker-compose.yml"),
+    "--project-name",
+    f"modelkit-tests-{XDIST_WORKER}",
+]
+DOCKER_COMPOSE_ENV = {
+    **os.environ,
+    "MINIO_PORT": str(MINIO_PORT),
+    "GCS_PORT": str(GCS_PORT),
+    "AZURITE_PORT": str(AZURITE_PORT),
+    "AZURITE_PORT_QUEUE": str(AZURITE_PORT + 1),
+    "AZURITE_PORT_TABLE": str(AZURITE_PORT + 2),
+}
+
+
+# docker compose services, with the variable enabling their tests and their port
+STORAGE_SERVICES = {
+    "minio": ("ENABLE_S3_TEST", MINIO_PORT),
+    "fake-gcs": ("ENABLE_GCS_TEST", GCS_PORT),
+    "azurite": ("ENABLE_AZ_TEST", AZURITE_PORT),
+}
+_RUNNING_SERVICES = set()
+
+
+def _stop_storage_services(services):
+    _RUNNING_SERVICES.difference_update(services)
+    if services and not _keep_containers():
+        subprocess.call(
+            DOCKER_COMPOSE + ["rm", "--force", "--stop", *services],
+            env=DOCKER_COMPOSE_ENV,
+        )
+
+
+@atexit.register
+def _stop_running_storage_services():
+    # in case the session is aborted before the fixtures are torn down
+    _stop_storage_services(list(_RUNNING_SERVICES))
+
+
+def _wait_for_port(port, timeout=20):
+    deadline = time.monotonic() + timeout
+    while True:
+        with socket.socket() as sock:
+            sock.settimeout(0.2)
+            try:
+                sock.connect(("127.0.0.1", port))
+                return
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise
+        time.sleep(0.05)
+
+
+@contextlib.contextmanager
+def _storage_services(services):
+    """Run services of tests/assets/docker-compose.yml, they start concurrently
+
+    A container that is already running is reused, set
+    MODELKIT_TEST_KEEP_CONTAINERS=True to keep them running between test sessions.
+    """
+    _RUNNING_SERVICES.update(services)
+    try:
+        # a failed start is cleaned up too, since it may have left a container
+        subprocess.check_call(
+            DOCKER_COMPOSE + ["up", "--detach", *services], env=DOCKER_COMPOSE_ENV
+        )
+        with concurrent.futures.ThreadPoolExecutor(len(services)) as executor:
+            list(
+                executor.map(_wait_for_port, (STORAGE_SERVICES[s][1] for s in services))
+            )
+        yield
+    finally:
+        _stop_storage_services(services)
+
+
+@pytest.fixture(scope="session")
+def _enabled_storage_services():
+    """Start the storage emulators of all the enabled tests at once
+
+    Not with pytest-xdist: the tests of each provider are grouped on a worker (see the
+    `xdist_group` marks), and each `_*_server` fixture then only starts its own
+    emulator, on the worker that needs it.
+    """
+    services = [
+        service
+        for service, (env_var, _) in STORAGE_SERVICES.items()
+        if os.environ.get(env_var) == "True"
+    ]
+    if not services or "PYTEST_XDIST_WORKER" in os.environ:
+        yield
+        return
+    with _storage_services(services):
+        yield
+
+
+@contextlib.contextmanager
+def _storage_service(service):
+    if service in _RUNNING_SERVICES:
+        # started with the other enabled services
+        yield
+        return
+    with _storage_services([service]):
+        yield
+
+
+def _keep_containers():
+    return os.environ.get("MODELKIT_TEST_KEEP_CONTAINERS") == "True"
+
+
+def _delete_all_objects(driver):
+    """Empty the bucket with batched requests where the storage supports them"""
+    object_names = list(driver.iterate_objects())
+    if isinstance(driver, S3StorageDriver):
+        for i in range(0, len(object_names), 1000):
+            driver.client.delete_objects(
+                Bucket=driver.bucket,
+                Delete={
+                    "Objects": [{"Key": name} for name in object_names[i : i + 1000]],
+                    "Quiet": True,
+                },
+            )
+    elif isinstance(driver, AzureStorageDriver):
+        container = driver.client.get_container_client(driver.bucket)
+        for i in range(0, len(object_names), 256):
+            container.delete_blobs(*object_names[i : i + 256])
+    elif isinstance(driver, GCSStorageDriver):
+        driver.client.bucket(driver.bucket).delete_blobs(object_names)
+    else:
+        for object_name in object_names:
+            driver.delete_object(object_name)
 
 
 @pytest.fixture(scope="function")
@@ -41,7 +190,6 @@ def local_assetsmanager(base_dir, working_dir):
         ),
     )
     yield mng
-    _delete_all_objects(mng)
 
 
 def _get_mock_gcs_client():
@@ -55,150 +203,203 @@ def _get_mock_gcs_client():
         credentials=AnonymousCredentials(),
         project="test",
         _http=my_http,
-        client_options=ClientOptions(api_endpoint="https://127.0.0.1:4443"),
+        client_options=ClientOptions(api_endpoint=f"https://127.0.0.1:{GCS_PORT}"),
     )
 
 
-@pytest.fixture(scope="function")
-def gcs_assetsmanager(request, working_dir):
-    # kill previous fake gcs container (if any)
-    subprocess.call(
-        ["docker", "rm", "-f", "modelkit-storage-gcs-tests"], stderr=subprocess.DEVNULL
-    )
-    # start minio as docker container
-    minio_proc = subprocess.Popen(
-        [
-            "docker",
-            "run",
-            "-p",
-            "4443:4443",
-            "--name",
-            "modelkit-storage-gcs-tests",
-            "fsouza/fake-gcs-server",
-        ]
-    )
+@retry(
+    wait=wait_random_exponential(multiplier=1, min=0.1, max=1),
+    stop=stop_after_attempt(10),
+    retry=retry_if_exception(lambda x: isinstance(x, Exception)),
+    reraise=True,
+)
+def _create_gcs_bucket():
+    client = _get_mock_gcs_client()
+    try:
+        client.create_bucket("test-bucket")
+    except Conflict:
+        # the bucket exists in a reused container
+        pass
+    return client
 
-    def finalize():
-        subprocess.call(["docker", "stop", "modelkit-storage-gcs-tests"])
-        minio_proc.terminate()
-        minio_proc.wait()
 
-    request.addfinalizer(finalize)
+@pytest.fixture(scope="session")
+def _gcs_server(_enabled_storage_services):
+    # fake gcs is shared by all the tests of the session
+    with _storage_service("fake-gcs"):
+        client = _create_gcs_bucket()
+        # the client (and its connections) is shared by the tests of the session
+        yield client
+        if _keep_containers():
+            _delete_all_objects(
+                StorageProvider(
+                    provider="gcs", bucket="test-bucket", client=client
+                ).driver
+            )
 
+
+@pytest.fixture(scope="function")
+def gcs_assetsmanager(_gcs_server, working_dir):
     storage_provider = StorageProvider(
-        prefix="test-prefix",
+        prefix=f"test-prefix-{secrets.token_hex(8)}",
         provider="gcs",
         bucket="test-bucket",
-        client=_get_mock_gcs_client(),
+        client=_gcs_server,
     )
-    storage_provider.driver.client.create_bucket("test-bucket")
     mng = AssetsManager(assets_dir=working_dir, storage_provider=storage_provider)
     yield mng
 
 
-@retry(
-    wait=wait_random_exponential(multiplier=1, min=4, max=10),
-    stop=stop_after_attempt(5),
-    retry=retry_if_exception(lambda x: isinstance(x, Exception)),
-    reraise=True,
-)
-def _start_s3_manager(working_dir):
-    mng = AssetsManager(
+def _get_s3_client():
+    return boto3.session.Session().client(
+        "s3",
+        endpoint_url=f"http://127.0.0.1:{MINIO_PORT}",
+        aws_access_key_id="minioadmin",
+        aws_secret_access_key="minioadmin",
+        region_name="us-east-1",
+        config=botocore.config.Config(
+            max_pool_connections=20, retries={"max_attempts": 2, "mode": "standard"}
+        ),
+    )
+
+
+def _start_s3_manager(working_dir, client=None):
+    return AssetsManager(
         assets_dir=working_dir,
         storage_provider=StorageProvider(
-            prefix=f"test-assets-{uuid.uuid1().hex}",
+            prefix=f"test-assets-{secrets.token_hex(8)}",
             provider="s3",
+            client=client,
             aws_default_region="us-east-1",
             bucket="test-assets",
             aws_access_key_id="minioadmin",
             aws_secret_access_key="minioadmin",
             aws_session_token=None,
-            s3_endpoint="http://127.0.0.1:9000",
+            s3_endpoint=f"http://127.0.0.1:{MINIO_PORT}",
         ),
     )
-    mng.storage_provider.driver.client.create_bucket(Bucket="test-assets")
-    return mng
-
-
-@pytest.fixture(scope="function")
-def s3_assetsmanager(request, working_dir):
-    # kill previous minio container (if any)
-    subprocess.call(
-        ["docker", "rm", "-f", "modelkit-storage-minio-tests"],
-        stderr=subprocess.DEVNULL,
-    )
-    # start minio as docker container
-    minio_proc = subprocess.Popen(
-        [
-            "docker",
-            "run",
-            "-p",
-            "9000:9000",
-            "--name",
-            "modelkit-storage-minio-tests",
-            "minio/minio",
-            "server",
-            "/data",
-        ]
-    )
-    yield _start_s3_manager(working_dir)
-
-    subprocess.call(["docker", "stop", "modelkit-storage-minio-tests"])
-    minio_proc.wait()
 
 
 @retry(
-    wait=wait_random_exponential(multiplier=1, min=4, max=10),
-    stop=stop_after_attempt(5),
+    wait=wait_random_exponential(multiplier=1, min=0.1, max=1),
+    stop=stop_after_attempt(10),
     retry=retry_if_exception(lambda x: isinstance(x, Exception)),
     reraise=True,
 )
-def _start_az_manager(working_dir):
-    mng = AssetsManager(
+def _create_s3_bucket(working_dir):
+    mng = _start_s3_manager(working_dir, client=_get_s3_client())
+    try:
+        mng.storage_provider.driver.client.create_bucket(Bucket="test-assets")
+    except ClientError as e:
+        # the bucket exists in a reused container
+        if e.response["Error"]["Code"] != "BucketAlreadyOwnedByYou":
+            raise
+    return mng
+
+
+@pytest.fixture(scope="session")
+def _minio_server(_enabled_storage_services, tmp_path_factory):
+    # minio is shared by all the tests of the session
+    with _storage_service("minio"):
+        mng = _create_s3_bucket(str(tmp_path_factory.mktemp("minio")))
+        # the client (and its connection pool) is shared by the tests of the session
+        yield mng.storage_provider.driver.client
+        if _keep_containers():
+            _delete_all_objects(mng.storage_provider.driver)
+
+
+@pytest.fixture(scope="function")
+def s3_assetsmanager(_minio_server, working_dir):
+    mng = _start_s3_manager(working_dir, client=_minio_server)
+    yield mng
+
+
+def _start_az_manager(working_dir, client=None):
+    return AssetsManager(
         assets_dir=working_dir,
         storage_provider=StorageProvider(
-            prefix=f"test-assets-{uuid.uuid1().hex}",
+            prefix=f"test-assets-{secrets.token_hex(8)}",
             provider="az",
             bucket="test-assets",
+            client=client,
             connection_string=(
                 "DefaultEndpointsProtocol=http;"
                 "AccountName=devstoreaccount1;"
                 "AccountKey=Eby8vdM02xNOcqFlqUwJPLlmEtlCDXJ1OUzFT50uSR"
                 "Z6IFsuFq2UVErCz4I6tq/K1SZFPTOtr/KBHBeksoGMGw==;"
-                "BlobEndpoint=http://127.0.0.1:10000/devstoreaccount1;"
-                "QueueEndpoint=http://127.0.0.1:10001/devstoreaccount1;"
-                "TableEndpoint=http://127.0.0.1:10002/devstoreaccount1;"
+                f"BlobEndpoint=http://127.0.0.1:{AZURITE_PORT}/devstoreaccount1;"
+                f"QueueEndpoint=http://127.0.0.1:{AZURITE_PORT + 1}/devstoreaccount1;"
+                f"TableEndpoint=http://127.0.0.1:{AZURITE_PORT + 2}/devstoreaccount1;"
             ),
         ),
     )
-    mng.storage_provider.driver.client.create_container("test-assets")
+
+
+@retry(
+    wait=wait_random_exponential(multiplier=1, min=0.1, max=1),
+    stop=stop_after_attempt(10),
+    retry=retry_if_exception(lambda x: isinstance(x, Exception)),
+    reraise=True,
+)
+def _create_az_container(working_dir):
+    mng = _start_az_manager(working_dir)
+    try:
+        mng.storage_provider.driver.client.create_container("test-assets")
+    except ResourceExistsError:
+        # the container exists in a reused azurite container
+        pass
     return mng
 
 
+@pytest.fixture(scope="session")
+def _azurite_server(_enabled_storage_services, tmp_path_factory):
+    # azurite is shared by all the tests of the session
+    with _storage_service("azurite"):
+        mng = _create_az_container(str(tmp_path_factory.mktemp("azurite")))
+        # the client (and its connections) is shared by the tests of the session
+        yield mng.storage_provider.driver.client
+        if _keep_containers():
+            _delete_all_objects(mng.storage_provider.driver)
+
+
 @pytest.fixture(scope="function")
-def az_assetsmanager(request, working_dir):
-    # kill previous minio container (if any)
-    subprocess.call(
-        ["docker", "rm", "-f", "modelkit-storage-azurite-tests"],
-        stderr=subprocess.DEVNULL,
-    )
-    # start minio as docker container
-    azurite_proc = subprocess.Popen(
-        [
-            "docker",
-            "run",
-            "-p",
-            "10002:10002",
-            "-p",
-            "10001:10001",
-            "-p",
-            "10000:10000",
-            "--name",
-            "modelkit-storage-azurite-tests",
-            "mcr.microsoft.com/azure-storage/azurite",
-        ]
-    )
-    yield _start_az_manager(working_dir)
+def az_assetsmanager(_azurite_server, working_dir):
+    mng = _start_az_manager(working_dir, client=_azurite_server)
+    yield mng
+
+
+@pytest.fixture(
+    params=[
+        "local",
+        pytest.param(
+            "gcs",
+            marks=[
+                skip_unless("ENABLE_GCS_TEST", "True"),
+                pytest.mark.xdist_group("gcs"),
+            ],
+        ),
+        pytest.param(
+            "s3",
+            marks=[
+                skip_unless("ENABLE_S3_TEST", "True"),
+                pytest.mark.xdist_group("s3"),
+            ],
+        ),
+        pytest.param(
+            "az",
+            marks=[
+                skip_unless("ENABLE_AZ_TEST", "True"),
+                pytest.mark.xdist_group("az"),
+            ],
+        ),
+    ]
+)
+def assetsmanager(request):
+    """The assets manager of each storage provider, for provider-agnostic tests
 
-    subprocess.call(["docker", "stop", "modelkit-storage-azurite-tests"])
-    azurite_proc.wait()
+    With `pytest -n auto --dist loadgroup`, the tests of a remote provider all run on
+    the same worker, which is the only one to start its emulator, while the providers
+    run in parallel on different workers. Other tests using a remote provider's
+    fixtures must carry the same `xdist_group` mark.
+    """
+    return request.getfixturevalue(f"{request.param}_assetsmanager")
@@ -1,14 +1,8 @@
 #!/usr/bin/env python3
-import os
-import sys
-
 import click
 
-root_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
-sys.path.append(root_dir)
-
-from modelkit.assets.remote import StorageProvider  # NOQA  # isort:skip
-from modelkit.assets.manager import AssetsManager  # NOQA  # isort:skip
+from modelkit.assets.manager import AssetsManager
+from modelkit.assets.remote import StorageProvider
 
 
 @click.command()
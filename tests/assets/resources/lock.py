@@ -1,4 +1,5 @@
 #!/usr/bin/env python3
+import sys
 import time
 
 import click
@@ -11,16 +12,18 @@ import filelock
 def wait(lock_path, duration_s):
     """Take a lock, wait a bit, release the lock
 
-    And print the acquisition and release time, as well as wait loops.
+    And print the acquisition and release times, in nanoseconds.
     """
     with filelock.FileLock(lock_path, 3 * 60):
         # We can't use time.monotonic() as we're comparing time between processes and
         # time.monotonic() explicitly does not support that
         # This means the test can fail during leap seconds, but this is only a test, we
         # don't need total reliability
-        print(time.time())
+        acquired_ns = time.time_ns()
         time.sleep(duration_s)
-        print(time.time())
+        released_ns = time.time_ns()
+    sys.stdout.write(f"{acquired_ns}\n{released_ns}\n")
+    sys.stdout.flush()
 
 
 if __name__ == "__main__":
@@ -59,3 +59,18 @@ def test_generic_check_version_valid(test, valid):
     else:
         with pytest.raises(errors.InvalidVersionError):
             AssetSpec.check_version_valid(test)
+
+
+def test_from_string_cached():
+    spec = AssetSpec.from_string("a/b:1")
+    spec.set_latest_version(["1.2", "1.1"])
+    assert spec.version == "1.2"
+    # the parsing is cached, not the specs
+    other_spec = AssetSpec.from_string("a/b:1")
+    assert other_spec is not spec
+    assert other_spec.version == "1"
+
+    with pytest.raises(errors.InvalidAssetSpecError):
+        AssetSpec.from_string("a/b:1?")
+    with pytest.raises(errors.InvalidAssetSpecError):
+        AssetSpec.from_string("a/b:1?")
@@ -10,12 +10,14 @@ from modelkit.assets.manager import AssetsManager, _success_file_path
 from modelkit.assets.remote import StorageProvider
 from tests.conftest import skip_unless
 
-test_path = os.path.dirname(os.path.realpath(__file__))
+TESTDATA_PATH = os.path.join(os.path.dirname(__file__), "testdata")
+SOME_DATA_PATH = os.path.join(TESTDATA_PATH, "some_data.json")
+SOME_DATA_FOLDER_PATH = os.path.join(TESTDATA_PATH, "some_data_folder")
 
 
 def _perform_mng_test(mng):
     # test pushing a file asset
-    data_path = os.path.join(test_path, "testdata", "some_data.json")
+    data_path = SOME_DATA_PATH
     mng.storage_provider.push(data_path, "category-test/some-data.ext", "1.0")
     # check metadata
     meta = mng.storage_provider.get_asset_meta("category-test/some-data.ext", "1.0")
@@ -33,7 +35,7 @@ def _perform_mng_test(mng):
     assert filecmp.cmp(fetched_path, data_path)
 
     # test pushing a directory asset
-    data_path = os.path.join(test_path, "testdata", "some_data_folder")
+    data_path = SOME_DATA_FOLDER_PATH
     mng.storage_provider.push(data_path, "category-test/some-data-2", "1.0")
 
     # check metadata
@@ -80,28 +82,14 @@ def _perform_mng_test(mng):
     assert d["from_cache"]
 
 
-def test_local_assetsmanager(local_assetsmanager):
-    _perform_mng_test(local_assetsmanager)
-
-
-@skip_unless("ENABLE_GCS_TEST", "True")
-def test_gcs_assetsmanager(gcs_assetsmanager):
-    _perform_mng_test(gcs_assetsmanager)
-
-
-@skip_unless("ENABLE_S3_TEST", "True")
-def test_s3_assetsmanager(s3_assetsmanager):
-    _perform_mng_test(s3_assetsmanager)
-
-
-@skip_unless("ENABLE_AZ_TEST", "True")
-def test_az_assetsmanager(az_assetsmanager):
-    _perform_mng_test(az_assetsmanager)
+def test_assetsmanager(assetsmanager):
+    _perform_mng_test(assetsmanager)
 
 
 @skip_unless("ENABLE_GCS_TEST", "True")
+@pytest.mark.xdist_group("gcs")
 def test_download_object_or_prefix_cli(gcs_assetsmanager):
-    original_asset_path = os.path.join(test_path, "testdata", "some_data.json")
+    original_asset_path = SOME_DATA_PATH
 
     provider = gcs_assetsmanager.storage_provider
 
@@ -139,17 +127,21 @@ def test_download_object_or_prefix_cli(gcs_assetsmanager):
             )
 
 
-def test_assetsmanager_force_download(monkeypatch, base_dir, working_dir):
-    # Setup a bucket
-    bucket_path = os.path.join(base_dir, "local_driver", "bucket")
-    os.makedirs(bucket_path)
+@pytest.fixture(scope="module")
+def some_data_bucket(tmp_path_factory):
+    # the tests only read from the bucket, so the assets are pushed once
+    bucket_path = str(tmp_path_factory.mktemp("bucket"))
+    storage_provider = StorageProvider(provider="local", bucket=bucket_path)
+    storage_provider.push(SOME_DATA_PATH, "category-test/some-data.ext", "1.0")
+    storage_provider.push(TESTDATA_PATH, "category-test/some-data-dir", "1.0")
+    return bucket_path
 
+
+def test_assetsmanager_force_download(monkeypatch, some_data_bucket, working_dir):
     mng = AssetsManager(
         assets_dir=working_dir,
-        storage_provider=StorageProvider(provider="local", bucket=bucket_path),
+        storage_provider=StorageProvider(provider="local", bucket=some_data_bucket),
     )
-    data_path = os.path.join(test_path, "testdata", "some_data.json")
-    mng.storage_provider.push(data_path, "category-test/some-data.ext", "1.0")
 
     asset_info = mng.fetch_asset("category-test/some-data.ext:1.0", return_info=True)
     assert not asset_info["from_cache"]
@@ -161,7 +153,7 @@ def test_assetsmanager_force_download(monkeypatch, base_dir, working_dir):
         assets_dir=working_dir,
         storage_provider=StorageProvider(
             provider="local",
-            bucket=bucket_path,
+            bucket=some_data_bucket,
             force_download=True,
         ),
     )
@@ -173,7 +165,7 @@ def test_assetsmanager_force_download(monkeypatch, base_dir, working_dir):
     monkeypatch.setenv("MODELKIT_STORAGE_FORCE_DOWNLOAD", "True")
     mng_force = AssetsManager(
         assets_dir=working_dir,
-        storage_provider=StorageProvider(provider="local", bucket=bucket_path),
+        storage_provider=StorageProvider(provider="local", bucket=some_data_bucket),
     )
     asset_info_force_env = mng_force.fetch_asset(
         "category-test/some-data.ext:1.0", return_info=True
@@ -181,22 +173,15 @@ def test_assetsmanager_force_download(monkeypatch, base_dir, working_dir):
     assert not asset_info_force_env["from_cache"]
 
 
-def test_assetsmanager_retry_on_fail(base_dir, working_dir):
-    # Setup a bucket
-    bucket_path = os.path.join(base_dir, "local_driver", "bucket")
-    os.makedirs(bucket_path)
-
+def test_assetsmanager_retry_on_fail(some_data_bucket, working_dir):
     mng = AssetsManager(
         assets_dir=working_dir,
         storage_provider=StorageProvider(
             provider="local",
-            bucket=bucket_path,
+            bucket=some_data_bucket,
         ),
     )
     # Try with a file asset
-    data_path = os.path.join(test_path, "testdata", "some_data.json")
-    mng.storage_provider.push(data_path, "category-test/some-data.ext", "1.0")
-
     asset_info = mng.fetch_asset("category-test/some-data.ext:1.0", return_info=True)
     assert not asset_info["from_cache"]
     assert os.path.exists(_success_file_path(asset_info["path"]))
@@ -207,9 +192,6 @@ def test_assetsmanager_retry_on_fail(base_dir, working_dir):
     assert not asset_info["from_cache"]
 
     # Try with a directory asset
-    data_path = os.path.join(test_path, "testdata")
-    mng.storage_provider.push(data_path, "category-test/some-data-dir", "1.0")
-
     asset_info = mng.fetch_asset("category-test/some-data-dir:1.0", return_info=True)
     assert not asset_info["from_cache"]
     assert os.path.exists(_success_file_path(asset_info["path"]))
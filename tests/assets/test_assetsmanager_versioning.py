@@ -4,20 +4,20 @@ import os
 import pytest
 
 from modelkit.assets import errors
-from tests.conftest import skip_unless
 
-test_path = os.path.dirname(os.path.realpath(__file__))
+TESTDATA_PATH = os.path.join(os.path.dirname(__file__), "testdata")
+SOME_DATA_PATH = os.path.join(TESTDATA_PATH, "some_data.json")
 
 
 def _perform_mng_test(mng):
     # test dry run for new asset
-    data_path = os.path.join(test_path, "testdata", "some_data.json")
+    data_path = SOME_DATA_PATH
     mng.storage_provider.new(data_path, "category-test/some-data", "0.0", dry_run=True)
     with pytest.raises(errors.ObjectDoesNotExistError):
         mng.fetch_asset("category-test/some-data")
 
     # test updating an inexistant asset
-    data_path = os.path.join(test_path, "testdata", "some_data.json")
+    data_path = SOME_DATA_PATH
     with pytest.raises(errors.AssetDoesNotExistError):
         mng.storage_provider.update(data_path, "category-test/some-data", version="0.0")
 
@@ -72,8 +72,10 @@ def _perform_mng_test(mng):
     assert fetched_asset_dict["from_cache"] is True
     assert fetched_asset_dict["version"] == "1.0"
 
-    assert list(mng.storage_provider.iterate_assets()) == [
-        ("category-test/some-data", ["1.0", "0.1", "0.0"])
+    assert mng.storage_provider.get_versions_info("category-test/some-data") == [
+        "1.0",
+        "0.1",
+        "0.0",
     ]
 
     # pushing via new works
@@ -92,20 +94,5 @@ def _perform_mng_test(mng):
     ]
 
 
-def test_local_assetsmanager_versioning(local_assetsmanager):
-    _perform_mng_test(local_assetsmanager)
-
-
-@skip_unless("ENABLE_GCS_TEST", "True")
-def test_gcs_assetsmanager_versioning(gcs_assetsmanager):
-    _perform_mng_test(gcs_assetsmanager)
-
-
-@skip_unless("ENABLE_S3_TEST", "True")
-def test_s3_assetsmanager_versioning(s3_assetsmanager):
-    _perform_mng_test(s3_assetsmanager)
-
-
-@skip_unless("ENABLE_AZ_TEST", "True")
-def test_az_assetsmanager_versioning(az_assetsmanager):
-    _perform_mng_test(az_assetsmanager)
+def test_assetsmanager_versioning(assetsmanager):
+    _perform_mng_test(assetsmanager)
@@ -1,37 +1,58 @@
 import os
 import pickle
-import tempfile
 from typing import Optional
 
 from modelkit.assets.drivers.abc import StorageDriver, StorageDriverSettings
 from modelkit.assets.drivers.local import LocalStorageDriver
 from tests import TEST_DIR
-from tests.conftest import skip_unless
 
 
-def _perform_driver_test(driver):
-    assert not driver.exists("some/object")
+class MockedDriver(StorageDriver):
+    @staticmethod
+    def build_client(_):
+        return {"built": True, "passed": False}
+
+    def delete_object(self, object_name: str):
+        ...
+
+    def download_object(self, object_name: str, destination_path: str):
+        ...
+
+    def exists(self, object_name: str) -> bool:
+        ...
+
+    def upload_object(self, file_path: str, object_name: str):
+        ...
+
+    def get_object_uri(self, object_name: str, sub_part: Optional[str] = None):
+        ...
+
+    def iterate_objects(self, prefix: Optional[str] = None):
+        ...
+
+
+def _perform_driver_test(driver, prefix, tmp_path):
+    # the remote buckets are shared by the tests of the session
+    object_name = f"{prefix}/some/object"
+    assert not driver.exists(object_name)
 
     # put an object
-    with tempfile.TemporaryDirectory() as tempd:
-        with open(os.path.join(tempd, "name"), "w") as fsrc:
-            fsrc.write("some contents")
-        driver.upload_object(os.path.join(tempd, "name"), "some/object")
-    assert driver.exists("some/object")
+    src_path = tmp_path / "name"
+    src_path.write_text("some contents")
+    driver.upload_object(str(src_path), object_name)
+    assert driver.exists(object_name)
 
     # download an object
-    with tempfile.TemporaryDirectory() as tempdir:
-        temp_path = os.path.join(tempdir, "test")
-        driver.download_object("some/object", temp_path)
-        with open(temp_path) as fdst:
-            assert fdst.read() == "some contents"
+    dst_path = tmp_path / "test"
+    driver.download_object(object_name, str(dst_path))
+    assert dst_path.read_text() == "some contents"
 
     # iterate objects
-    assert [x for x in driver.iterate_objects()] == ["some/object"]
+    assert [x for x in driver.iterate_objects(prefix)] == [object_name]
 
     # delete the object
-    driver.delete_object("some/object")
-    assert not driver.exists("some/object")
+    driver.delete_object(object_name)
+    assert not driver.exists(object_name)
 
 
 def _perform_pickability_test(driver, monkeypatch):
@@ -40,44 +61,57 @@ def _perform_pickability_test(driver, monkeypatch):
     # Hence the need to set driver's _client property to None
     monkeypatch.setattr(driver, "_client", None)
     assert pickle.dumps(driver)
+    monkeypatch.undo()
+    # the client is dropped when pickling, and built on first use
+    unpickled_driver = pickle.loads(pickle.dumps(driver))
+    assert unpickled_driver.bucket == driver.bucket
+    assert unpickled_driver._client is None
+
+
+def test_driver(assetsmanager, tmp_path):
+    _perform_driver_test(
+        assetsmanager.storage_provider.driver,
+        assetsmanager.storage_provider.prefix,
+        tmp_path,
+    )
 
 
-def test_local_driver(local_assetsmanager):
-    _perform_driver_test(local_assetsmanager.storage_provider.driver)
-
-
-def test_local_driver_pickable(local_assetsmanager, monkeypatch):
-    _perform_pickability_test(local_assetsmanager.storage_provider.driver, monkeypatch)
-
-
-@skip_unless("ENABLE_GCS_TEST", "True")
-def test_gcs_driver(gcs_assetsmanager):
-    _perform_driver_test(gcs_assetsmanager.storage_provider.driver)
-
-
-@skip_unless("ENABLE_GCS_TEST", "True")
-def test_gcs_driver_pickable(gcs_assetsmanager, monkeypatch):
-    _perform_pickability_test(gcs_assetsmanager.storage_provider.driver, monkeypatch)
-
-
-@skip_unless("ENABLE_S3_TEST", "True")
-def test_s3_driver(s3_assetsmanager):
-    _perform_driver_test(s3_assetsmanager.storage_provider.driver)
+def test_driver_pickable(assetsmanager, monkeypatch):
+    _perform_pickability_test(assetsmanager.storage_provider.driver, monkeypatch)
 
 
-@skip_unless("ENABLE_S3_TEST", "True")
-def test_s3_driver_pickable(s3_assetsmanager, monkeypatch):
-    _perform_pickability_test(s3_assetsmanager.storage_provider.driver, monkeypatch)
+def test_driver_pickable_with_client(monkeypatch):
+    settings = StorageDriverSettings(bucket="bucket")
+    driver = MockedDriver(settings, client={"built": False, "passed": True})
+    unpickled_driver = pickle.loads(pickle.dumps(driver))
+    # the passed client is not pickled, the driver builds its own on first use
+    assert unpickled_driver._client is None
+    assert unpickled_driver.client == {"built": True, "passed": False}
+    assert unpickled_driver._client == {"built": True, "passed": False}
 
+    monkeypatch.setenv("MODELKIT_LAZY_DRIVER", "True")
+    settings = StorageDriverSettings(bucket="bucket")
+    driver = MockedDriver(settings, client={"built": False, "passed": True})
+    unpickled_driver = pickle.loads(pickle.dumps(driver))
+    assert unpickled_driver.client == {"built": True, "passed": False}
+    # lazy drivers do not keep the clients they build
+    assert unpickled_driver._client is None
 
-@skip_unless("ENABLE_AZ_TEST", "True")
-def test_az_driver(az_assetsmanager):
-    _perform_driver_test(az_assetsmanager.storage_provider.driver)
 
+def test_local_driver_iterate_objects(working_dir):
+    driver = LocalStorageDriver(settings={"bucket": working_dir})
+    data_path = os.path.join(TEST_DIR, "assets", "testdata", "some_data.json")
+    for object_name in ["a/b/c", "a/bc/d", "a/c", "ab", ".hidden", "a/.hidden"]:
+        driver.upload_object(data_path, object_name)
 
-@skip_unless("ENABLE_AZ_TEST", "True")
-def test_az_driver_pickable(az_assetsmanager, monkeypatch):
-    _perform_pickability_test(az_assetsmanager.storage_provider.driver, monkeypatch)
+    assert sorted(driver.iterate_objects()) == ["a/b/c", "a/bc/d", "a/c", "ab"]
+    assert sorted(driver.iterate_objects("a")) == ["a/b/c", "a/bc/d", "a/c", "ab"]
+    assert sorted(driver.iterate_objects("a/")) == ["a/b/c", "a/bc/d", "a/c"]
+    assert sorted(driver.iterate_objects("a/b")) == ["a/b/c", "a/bc/d"]
+    assert sorted(driver.iterate_objects("a/b/")) == ["a/b/c"]
+    assert sorted(driver.iterate_objects("a/c")) == ["a/c"]
+    assert sorted(driver.iterate_objects("a/c/")) == []
+    assert sorted(driver.iterate_objects("b/")) == []
 
 
 def test_local_driver_overwrite(working_dir):
@@ -104,29 +138,6 @@ def test_local_driver_overwrite(working_dir):
 
 
 def test_storage_driver_client(monkeypatch):
-    class MockedDriver(StorageDriver):
-        @staticmethod
-        def build_client(_):
-            return {"built": True, "passed": False}
-
-        def delete_object(self, object_name: str):
-            ...
-
-        def download_object(self, object_name: str, destination_path: str):
-            ...
-
-        def exists(self, object_name: str) -> bool:
-            ...
-
-        def upload_object(self, file_path: str, object_name: str):
-            ...
-
-        def get_object_uri(self, object_name: str, sub_part: Optional[str] = None):
-            ...
-
-        def iterate_objects(self, prefix: Optional[str] = None):
-            ...
-
     # the storage provider should not build the client
     # since passed at instantiation
     settings = StorageDriverSettings(bucket="bucket")
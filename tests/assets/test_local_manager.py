@@ -4,7 +4,7 @@ import stat
 
 import pytest
 
-from modelkit.assets import errors
+from modelkit.assets import errors, remote
 from modelkit.assets.manager import AssetsManager, _fetch_local_version
 from modelkit.assets.remote import StorageProvider
 from modelkit.assets.settings import AssetSpec
@@ -25,22 +25,19 @@ def test_local_manager_no_versions(working_dir):
     assert res["path"] == os.path.join(working_dir, "something", "else", "deep.txt")
 
     # valid relative path to CWD
-    manager = AssetsManager()
-    res = manager.fetch_asset("README.md", return_info=True)
+    cwd_manager = AssetsManager()
+    res = cwd_manager.fetch_asset("README.md", return_info=True)
     assert res["path"] == os.path.join(os.getcwd(), "README.md")
 
     # valid relative path to CWD with assets dir
-    manager = AssetsManager(assets_dir=working_dir)
     res = manager.fetch_asset("README.md", return_info=True)
     assert res["path"] == os.path.join(os.getcwd(), "README.md")
 
     # valid absolute path
-    manager = AssetsManager(assets_dir=working_dir)
     res = manager.fetch_asset(os.path.join(os.getcwd(), "README.md"), return_info=True)
     assert res["path"] == os.path.join(os.getcwd(), "README.md")
 
     # valid relative path dir
-    manager = AssetsManager(assets_dir=working_dir)
     res = manager.fetch_asset("something", return_info=True)
     assert res["path"] == os.path.join(working_dir, "something")
 
@@ -74,70 +71,63 @@ def test_local_manager_no_versions(working_dir):
     ],
 )
 def test_local_manager_with_versions(
-    v00, v01, v11, v10, versioning, working_dir, monkeypatch
+    v00, v01, v11, v10, versioning, working_dir, tmp_path, monkeypatch
 ):
     if versioning:
         monkeypatch.setenv("MODELKIT_ASSETS_VERSIONING_SYSTEM", versioning)
 
-    os.makedirs(os.path.join(working_dir, "something", v00))
-    open(os.path.join(working_dir, "something", v00, ".SUCCESS"), "w").close()
+    asset_dir = os.path.join(working_dir, "something")
+    deep_path = os.path.join(asset_dir, v11, "subpart", "deep.txt")
+
+    os.makedirs(os.path.join(asset_dir, v00))
+    open(os.path.join(asset_dir, v00, ".SUCCESS"), "w").close()
 
-    os.makedirs(os.path.join(working_dir, "something", v01))
-    open(os.path.join(working_dir, "something", v01, ".SUCCESS"), "w").close()
+    os.makedirs(os.path.join(asset_dir, v01))
+    open(os.path.join(asset_dir, v01, ".SUCCESS"), "w").close()
 
-    os.makedirs(os.path.join(working_dir, "something", v11, "subpart"))
-    with open(
-        os.path.join(working_dir, "something", v11, "subpart", "deep.txt"), "w"
-    ) as f:
+    os.makedirs(os.path.dirname(deep_path))
+    with open(deep_path, "w") as f:
         f.write("OK")
-    open(os.path.join(working_dir, "something", v11, ".SUCCESS"), "w").close()
+    open(os.path.join(asset_dir, v11, ".SUCCESS"), "w").close()
 
     manager = AssetsManager(assets_dir=working_dir)
     res = manager.fetch_asset(f"something:{v11}[subpart/deep.txt]", return_info=True)
-    assert res["path"] == os.path.join(
-        working_dir, "something", v11, "subpart", "deep.txt"
-    )
+    assert res["path"] == deep_path
 
-    manager = AssetsManager(assets_dir=working_dir)
     res = manager.fetch_asset(f"something/{v11}/subpart/deep.txt", return_info=True)
-    assert res["path"] == os.path.join(
-        working_dir, "something", v11, "subpart", "deep.txt"
-    )
+    assert res["path"] == deep_path
 
-    manager = AssetsManager(assets_dir=working_dir)
     res = manager.fetch_asset(f"something:{v00}", return_info=True)
-    assert res["path"] == os.path.join(working_dir, "something", v00)
+    assert res["path"] == os.path.join(asset_dir, v00)
 
-    manager = AssetsManager(assets_dir=working_dir)
     res = manager.fetch_asset("something", return_info=True)
-    assert res["path"] == os.path.join(working_dir, "something", v11)
+    assert res["path"] == os.path.join(asset_dir, v11)
 
     if versioning in (None, "major_minor"):
-        manager = AssetsManager(assets_dir=working_dir)
         res = manager.fetch_asset("something:0", return_info=True)
-        assert res["path"] == os.path.join(working_dir, "something", v01)
+        assert res["path"] == os.path.join(asset_dir, v01)
 
-    try:
-        manager = AssetsManager()
-        local_dir = os.path.join("tmp-local-asset", v10, "subpart")
-        os.makedirs(local_dir)
-        open(os.path.join("tmp-local-asset", v10, ".SUCCESS"), "w").close()
+    # assets relative to the CWD
+    monkeypatch.chdir(tmp_path)
+    manager = AssetsManager()
+    local_dir = os.path.join("tmp-local-asset", v10, "subpart")
+    os.makedirs(local_dir)
+    open(os.path.join("tmp-local-asset", v10, ".SUCCESS"), "w").close()
 
-        shutil.copy("README.md", local_dir)
+    with open(os.path.join(local_dir, "README.md"), "w") as f:
+        f.write("OK")
 
-        res = manager.fetch_asset(
-            f"tmp-local-asset:{v10}[subpart/README.md]", return_info=True
-        )
-        assert res["path"] == os.path.abspath(os.path.join(local_dir, "README.md"))
+    res = manager.fetch_asset(
+        f"tmp-local-asset:{v10}[subpart/README.md]", return_info=True
+    )
+    assert res["path"] == os.path.abspath(os.path.join(local_dir, "README.md"))
 
-        res = manager.fetch_asset("tmp-local-asset", return_info=True)
-        assert res["path"] == os.path.abspath(os.path.join(local_dir, ".."))
+    res = manager.fetch_asset("tmp-local-asset", return_info=True)
+    assert res["path"] == os.path.abspath(os.path.join(local_dir, ".."))
 
-        abs_path_to_readme = os.path.join(os.path.abspath(local_dir), "README.md")
-        res = manager.fetch_asset(abs_path_to_readme, return_info=True)
-        assert res["path"] == abs_path_to_readme
-    finally:
-        shutil.rmtree("tmp-local-asset")
+    abs_path_to_readme = os.path.join(os.path.abspath(local_dir), "README.md")
+    res = manager.fetch_asset(abs_path_to_readme, return_info=True)
+    assert res["path"] == abs_path_to_readme
 
 
 @pytest.mark.parametrize(*test_versioning.TWO_VERSIONING_PARAMETRIZE)
@@ -378,3 +368,43 @@ def test_fetch_local_version():
 
     with pytest.raises(errors.AssetDoesNotExistError):
         _fetch_local_version("asset/not/exists", "")
+
+
+@pytest.mark.parametrize("use_msgspec", [True, False])
+def test_get_asset_meta(base_dir, monkeypatch, use_msgspec):
+    monkeypatch.setattr(remote, "has_msgspec", use_msgspec)
+    storage_provider = StorageProvider(provider="local", bucket=base_dir)
+    storage_provider.push(
+        os.path.join(TEST_DIR, "assets", "testdata", "some_data.json"),
+        "category/asset",
+        "1.0",
+    )
+    storage_provider.push(
+        os.path.join(TEST_DIR, "assets", "testdata", "some_data_folder"),
+        "category/dir_asset",
+        "1.0",
+    )
+    meta = storage_provider.get_asset_meta("category/asset", "1.0")
+    assert not meta["is_directory"]
+    assert meta["push_date"].tzinfo is not None
+    dir_meta = storage_provider.get_asset_meta("category/dir_asset", "1.0")
+    contents = list(dir_meta["contents"])
+    assert contents
+
+    # the meta of a pushed asset is immutable, it is only downloaded once
+    monkeypatch.setattr(
+        storage_provider.driver,
+        "download_object",
+        lambda *_: pytest.fail("meta downloaded again"),
+    )
+    # and changing a returned meta does not change the cached one
+    meta["is_directory"] = True
+    assert storage_provider.get_asset_meta("category/asset", "1.0") == {
+        **meta,
+        "is_directory": False,
+    }
+    dir_meta["contents"].append("other_file.json")
+    assert (
+        storage_provider.get_asset_meta("category/dir_asset", "1.0")["contents"]
+        == contents
+    )
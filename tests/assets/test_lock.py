@@ -42,7 +42,7 @@ def test_lock_file(working_dir):
     lock_path = os.path.join(working_dir, "lock")
     threads = []
     for _ in range(3):
-        t = _start_wait_process(lock_path, 2)
+        t = _start_wait_process(lock_path, 1)
         threads.append(t)
 
     # For each process, collect the timestamp when it acquired and released
@@ -56,7 +56,7 @@ def test_lock_file(working_dir):
         assert len(lines) == 2
         start = lines[0]
         end = lines[1]
-        ranges.append((float(start), float(end)))
+        ranges.append((int(start), int(end)))
     ranges.sort()
 
     # Check the range are exclusive: the lock works assuming it got hit
@@ -82,11 +82,11 @@ def test_lock_assetsmanager(capsys, working_dir):
     data_path = os.path.join(TEST_DIR, "assets", "testdata", "some_data_folder")
     mng.new(data_path, "category-test/some-data.ext", "0.0")
 
-    # start 4 processes that will attempt to download it
-    script_path = os.path.join(TEST_DIR, "assets", "resources", "download_asset.py")
+    # start 2 processes that will attempt to download it
     cmd = [
         sys.executable,
-        script_path,
+        "-m",
+        "tests.assets.resources.download_asset",
         assets_dir,
         driver_path,
         "category-test/some-data.ext:0.0",
@@ -95,6 +95,7 @@ def test_lock_assetsmanager(capsys, working_dir):
     def run():
         p = subprocess.Popen(
             cmd,
+            cwd=os.path.dirname(TEST_DIR),
             stdout=subprocess.PIPE,
             stderr=subprocess.STDOUT,
         )
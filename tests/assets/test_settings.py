@@ -6,7 +6,7 @@ from google.auth.exceptions import DefaultCredentialsError
 from modelkit.assets.manager import AssetsManager
 from modelkit.assets.remote import UnknownDriverError
 
-test_path = os.path.dirname(os.path.realpath(__file__))
+test_path = os.path.dirname(__file__)
 
 
 @pytest.mark.parametrize(
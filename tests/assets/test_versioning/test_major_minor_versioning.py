@@ -282,12 +282,16 @@ def get_string_spec(versions):
     return examples
 
 
-@pytest.mark.parametrize("s, spec", get_string_spec(["1", "1.2", "12"]))
-def test_string_asset_spec(s, spec):
-    assert AssetSpec.from_string(s) == AssetSpec(**spec)
-    assert AssetSpec.from_string(s, versioning="major_minor") == AssetSpec(
-        versioning="major_minor", **spec
-    )
+@pytest.mark.parametrize(
+    "s, expected",
+    [
+        (s, AssetSpec(versioning="major_minor", **spec))
+        for s, spec in get_string_spec(["1", "1.2", "12"])
+    ],
+)
+def test_string_asset_spec(s, expected):
+    assert AssetSpec.from_string(s) == expected
+    assert AssetSpec.from_string(s, versioning="major_minor") == expected
 
 
 def test_asset_spec_set_latest_version():
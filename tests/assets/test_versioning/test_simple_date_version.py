@@ -145,11 +145,15 @@ def test_asset_spec_get_local_versions():
     ]
 
 
-@pytest.mark.parametrize("s, spec", get_string_spec(["2021-11-14T18-00-00Z"]))
-def test_string_asset_spec(s, spec):
-    assert AssetSpec.from_string(s, versioning="simple_date") == AssetSpec(
-        versioning="simple_date", **spec
-    )
+@pytest.mark.parametrize(
+    "s, expected",
+    [
+        (s, AssetSpec(versioning="simple_date", **spec))
+        for s, spec in get_string_spec(["2021-11-14T18-00-00Z"])
+    ],
+)
+def test_string_asset_spec(s, expected):
+    assert AssetSpec.from_string(s, versioning="simple_date") == expected
 
 
 def test_asset_spec_set_latest_version():
@@ -1,5 +1,8 @@
 import asyncio
+import concurrent.futures
 import os
+import shutil
+import stat
 import tempfile
 
 import pytest
@@ -7,11 +10,35 @@ import pytest
 from modelkit.assets.remote import StorageProvider
 from tests import TEST_DIR
 
+# scratch directories are created under MODELKIT_TEST_TMPDIR if it is set,
+# pointing it to a tmpfs (e.g. /dev/shm) speeds up the assets tests
+TEST_TMPDIR = os.environ.get("MODELKIT_TEST_TMPDIR") or None
+
+# scratch directories are deleted in the background, the interpreter waits for
+# the pending deletions before exiting
+_RMTREE_EXECUTOR = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+
 
 @pytest.fixture(scope="function")
 def base_dir():
-    with tempfile.TemporaryDirectory() as base_dir:
-        yield base_dir
+    base_dir = tempfile.mkdtemp(prefix="modelkit-", dir=TEST_TMPDIR)
+    yield base_dir
+    if not os.path.exists(base_dir):
+        # removed or moved by the test
+        return
+    # renaming is immediate, and the next test cannot see the directory anymore
+    trash_dir = f"{base_dir}.trash"
+    os.rename(base_dir, trash_dir)
+    _RMTREE_EXECUTOR.submit(shutil.rmtree, trash_dir, onerror=_remove_read_only)
+
+
+def _remove_read_only(func, path, _):
+    # files of read-only directories, and read-only directories, are made
+    # writable before being removed again
+    os.chmod(os.path.dirname(path), stat.S_IRWXU)
+    if os.path.isdir(path) and not os.path.islink(path):
+        os.chmod(path, stat.S_IRWXU)
+    func(path)
 
 
 @pytest.fixture(scope="function")
@@ -8,6 +8,7 @@ import pydantic
 import pytest
 import redis
 
+import modelkit.utils.cache
 import modelkit.utils.redis
 from modelkit.core.library import ModelLibrary
 from modelkit.core.model import AsyncModel, Model
@@ -249,3 +250,65 @@ def test_redis_cache_error(monkeypatch):
             models=[SomeModelValidated],
             settings={"cache": {"cache_provider": "redis"}},
         )
+
+
+def test_redis_cache_serialization(monkeypatch):
+    msgspec = pytest.importorskip("msgspec")
+
+    class DictRedis(dict):
+        def set(self, k, v):
+            self[k] = v
+
+    monkeypatch.setattr(
+        modelkit.utils.cache, "connect_redis", lambda host, port: DictRedis()
+    )
+
+    class StructItem(msgspec.Struct):
+        ok: int
+
+    class Item(pydantic.BaseModel):
+        ok: int
+
+    predicted = []
+
+    class StructModel(Model[int, StructItem]):
+        CONFIGURATIONS = {
+            "struct_model": {"model_settings": {"cache_predictions": True}}
+        }
+
+        def _predict(self, item):
+            predicted.append(item)
+            return StructItem(ok=item)
+
+    class PydanticModel(Model[int, Item]):
+        CONFIGURATIONS = {
+            "pydantic_model": {"model_settings": {"cache_predictions": True}}
+        }
+
+        def _predict(self, item):
+            predicted.append(item)
+            return Item(ok=item)
+
+    lib = ModelLibrary(
+        models=[StructModel, PydanticModel],
+        settings={"cache": {"cache_provider": "redis"}},
+    )
+    assert isinstance(lib.cache, RedisCache)
+
+    m = lib.get("struct_model")
+    assert m(1) == StructItem(ok=1)
+    (payload,) = lib.cache.redis.values()
+    assert payload.startswith(modelkit.utils.cache.MSGPACK_TAG)
+    # cached structs are decoded back to the return type of the model
+    assert m(1) == StructItem(ok=1)
+    assert m.predict_batch([1, 2]) == [StructItem(ok=1), StructItem(ok=2)]
+    assert predicted == [1, 2]
+
+    m = lib.get("pydantic_model")
+    assert m(3) == Item(ok=3)
+    assert m(3) == Item(ok=3)
+    assert predicted == [1, 2, 3]
+
+    monkeypatch.setattr(modelkit.utils.cache, "has_msgspec", False)
+    with pytest.raises(modelkit.utils.redis.RedisCacheException):
+        RedisCache.loads(payload)
@@ -1,5 +1,8 @@
+import sys
+
 import pytest
 
+from modelkit.core import errors
 from modelkit.core.model import AsyncModel, Model
 
 
@@ -24,7 +27,7 @@ class ErrorBatchModel(Model):
 
 @pytest.mark.parametrize("model", [ErrorModel(), ErrorBatchModel()])
 def test_prediction_error(monkeypatch, model):
-    monkeypatch.setenv("MODELKIT_ENABLE_SIMPLE_TRACEBACK", True)
+    monkeypatch.setattr(errors, "ENABLE_SIMPLE_TRACEBACK", True)
     with pytest.raises(CustomError) as excinfo:
         model.predict({})
     assert len(excinfo.traceback) <= 3
@@ -39,7 +42,7 @@ def test_prediction_error(monkeypatch, model):
 
 
 def test_prediction_error_composition(monkeypatch):
-    monkeypatch.setenv("MODELKIT_ENABLE_SIMPLE_TRACEBACK", True)
+    monkeypatch.setattr(errors, "ENABLE_SIMPLE_TRACEBACK", True)
     mm = OKModel(model_dependencies={"error_model": ErrorModel()})
     mm.load()
 
@@ -58,7 +61,7 @@ def test_prediction_error_composition(monkeypatch):
 
 @pytest.mark.parametrize("model", [ErrorModel(), ErrorBatchModel()])
 def test_prediction_error_complex_tb(monkeypatch, model):
-    monkeypatch.setenv("MODELKIT_ENABLE_SIMPLE_TRACEBACK", False)
+    monkeypatch.setattr(errors, "ENABLE_SIMPLE_TRACEBACK", False)
     with pytest.raises(CustomError) as excinfo:
         model.predict({})
     assert len(excinfo.traceback) > 3
@@ -90,7 +93,7 @@ class AsyncErrorBatchModel(AsyncModel):
 @pytest.mark.asyncio
 @pytest.mark.parametrize("model", [AsyncErrorModel(), AsyncErrorBatchModel()])
 async def test_prediction_error_async(monkeypatch, model):
-    monkeypatch.setenv("MODELKIT_ENABLE_SIMPLE_TRACEBACK", True)
+    monkeypatch.setattr(errors, "ENABLE_SIMPLE_TRACEBACK", True)
     with pytest.raises(CustomError) as excinfo:
         await model.predict({})
     assert len(excinfo.traceback) <= 3
@@ -108,7 +111,7 @@ async def test_prediction_error_async(monkeypatch, model):
 @pytest.mark.asyncio
 @pytest.mark.parametrize("model", [AsyncErrorModel(), AsyncErrorBatchModel()])
 async def test_prediction_error_complex_tb_async(monkeypatch, model):
-    monkeypatch.setenv("MODELKIT_ENABLE_SIMPLE_TRACEBACK", False)
+    monkeypatch.setattr(errors, "ENABLE_SIMPLE_TRACEBACK", False)
     with pytest.raises(CustomError) as excinfo:
         await model.predict({})
     assert len(excinfo.traceback) > 3
@@ -172,3 +175,27 @@ async def test_internal_error_async(monkeypatch):
     with pytest.raises(CustomError):
         async for _ in m.predict_gen(iter(({},))):
             pass
+
+
+def test_is_modelkit_internal_frame_memoized():
+    frame = sys._getframe()
+    internal = errors.is_modelkit_internal_frame(frame)
+    assert errors._INTERNAL_FILENAMES[frame.f_code.co_filename] is internal
+    assert errors.is_modelkit_internal_frame(frame) is internal
+
+
+def test_set_simple_traceback(monkeypatch):
+    monkeypatch.setattr(errors, "ENABLE_SIMPLE_TRACEBACK", True)
+    errors.set_simple_traceback(False)
+    with pytest.raises(CustomError) as excinfo:
+        ErrorModel().predict({})
+    assert len(excinfo.traceback) > 3
+
+
+@pytest.mark.parametrize(
+    "value, enabled",
+    [("True", True), ("true", True), ("1", True), ("yes", True), ("False", False)],
+)
+def test_simple_traceback_from_env(monkeypatch, value, enabled):
+    monkeypatch.setenv("MODELKIT_ENABLE_SIMPLE_TRACEBACK", value)
+    assert errors.simple_traceback_from_env() is enabled
@@ -1,12 +1,10 @@
 import contextlib
-import os
+import logging
 
 import structlog
 from structlog.testing import capture_logs
 
-from modelkit.utils.logging import ContextualizedLogging
-
-test_path = os.path.dirname(os.path.realpath(__file__))
+from modelkit.utils.logging import ContextualizedLogging, is_enabled_for
 
 
 def test_json_logging(monkeypatch):
@@ -71,3 +69,16 @@ def test_json_context():
                 logger.info("context1 message", extra_value=1)
             logger.info("context0 message2")
     assert cap_logs == CONTEXT_RES
+
+
+def test_is_enabled_for():
+    old_wrapper_class = structlog.get_config()["wrapper_class"]
+    try:
+        structlog.configure(
+            wrapper_class=structlog.make_filtering_bound_logger(logging.INFO)
+        )
+        logger = structlog.get_logger("testing")
+        assert not is_enabled_for(logger, logging.DEBUG)
+        assert is_enabled_for(logger, logging.INFO)
+    finally:
+        structlog.configure(wrapper_class=old_wrapper_class)
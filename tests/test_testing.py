@@ -1,12 +1,21 @@
 import datetime
 import decimal
+import difflib
 import json
 import os
 import tempfile
 
 import pytest
 
-from modelkit.testing.reference import ReferenceJson, ReferenceText, deep_format_floats
+from modelkit.testing.reference import (
+    DUMP_KWARGS,
+    ReferenceJson,
+    ReferenceText,
+    _diff_lines,
+    _dumps,
+    _unified_diff,
+    deep_format_floats,
+)
 
 
 def test_referencejson(monkeypatch):
@@ -49,6 +58,47 @@ def test_referencejson(monkeypatch):
             r.assert_equal("objects.json", lambda f: None)
 
 
+def test_dumps():
+    doc = {
+        "b": [1, 2.5, None, True, {"z": [], "y": {}}],
+        "a": "é",
+        "date": datetime.date(2019, 1, 1),
+        "decimal": decimal.Decimal("0.1"),
+    }
+    assert _dumps(doc) == json.dumps(doc, **DUMP_KWARGS)
+    # not handled by orjson
+    assert _dumps({1: 2**70}) == json.dumps({1: 2**70}, **DUMP_KWARGS)
+    # orjson writes non-finite floats as null
+    for value in [float("nan"), float("inf"), -float("inf")]:
+        doc = {"a": [None, {"b": value}]}
+        assert _dumps(doc) == json.dumps(doc, **DUMP_KWARGS)
+        assert _dumps(doc) != _dumps({"a": [None, {"b": None}]})
+
+
+def test_referencejson_save_floats(monkeypatch):
+    monkeypatch.setenv("UPDATE_REF", "0")
+    doc = {"big": 1e16, "inf": float("inf"), "nan": float("nan"), "small": 1e-7}
+    with tempfile.TemporaryDirectory(prefix="common-") as tempdir:
+        r = ReferenceJson(tempdir)
+        r.assert_equal("test.json", doc, update_ref=True)
+        with open(os.path.join(tempdir, "test.json")) as f:
+            assert f.read() == json.dumps(doc, **DUMP_KWARGS)
+        with pytest.raises(AssertionError):
+            r.assert_equal("test.json", {**doc, "nan": None})
+
+
+def test_diff_lines():
+    ref_lines = [f"line {i}\n" for i in range(20)]
+    lines = ref_lines[:5] + ["changed\n"] + ref_lines[6:15]
+    assert list(_unified_diff(ref_lines, lines, "ref", "out")) == list(
+        difflib.unified_diff(ref_lines, lines, "ref", "out")
+    )
+    with pytest.raises(AssertionError, match="first mismatch at line 6 "):
+        _diff_lines("ref", ref_lines, lines)
+    with pytest.raises(AssertionError, match="first mismatch at line 16 "):
+        _diff_lines("ref", ref_lines, ref_lines[:15])
+
+
 def test_referencetext(monkeypatch):
     monkeypatch.setenv("UPDATE_REF", "0")
     with tempfile.TemporaryDirectory(prefix="common-") as tempdir:
@@ -82,3 +132,15 @@ def test_deep_format_floats():
     assert deep_format_floats({"a": [1.2345, {"b": 1.2345}]}, depth=2) == {
         "a": ["1.23", {"b": "1.23"}]
     }
+    assert deep_format_floats([(1.2, None, True), [], {}], depth=1) == [
+        ("1.2", None, True),
+        [],
+        {},
+    ]
+    nested: list = [1.2]
+    for _ in range(5000):
+        nested = [nested]
+    formatted = deep_format_floats(nested, depth=1)
+    for _ in range(5000):
+        formatted = formatted[0]
+    assert formatted == ["1.2"]
@@ -1,13 +1,23 @@
 import os
+import time
 
 import pytest
 import requests
 
 from modelkit import ModelLibrary, testing
+from modelkit.core.models import tensorflow_model
 from modelkit.core.models.tensorflow_model import (
     AsyncTensorflowModel,
     TensorflowModel,
+    acquire_grpc_channel_pool,
+    close_grpc_channel_pools,
+    connect_tf_serving_rest,
+    evict_grpc_channel_pool,
+    get_grpc_channel_pool,
+    grpc_compression,
     has_tensorflow,
+    release_grpc_channel_pool,
+    retry_tf_serving,
 )
 from modelkit.core.settings import LibrarySettings
 from modelkit.testing import tf_serving_fixture
@@ -383,6 +393,241 @@ async def _compare_models_async(model, model_async, items_and_results, tolerance
         ) from e
 
 
+@pytest.fixture
+def grpc_channel_pools():
+    # other tests (e.g. with TF serving) may leave pools behind
+    close_grpc_channel_pools()
+    yield
+    close_grpc_channel_pools()
+
+
+def test_grpc_channel_pool(monkeypatch, grpc_channel_pools):
+    pytest.importorskip("tensorflow_serving")
+    monkeypatch.setenv("MODELKIT_TF_SERVING_GRPC_POOL_SIZE", "2")
+    pool = get_grpc_channel_pool("localhost", 8500)
+    assert get_grpc_channel_pool("localhost", 8500) is pool
+    assert get_grpc_channel_pool("localhost", 8501) is not pool
+
+    assert len(pool.stubs) == 2
+    assert [pool.next_stub() for _ in range(4)] == pool.stubs * 2
+
+    # channels are renewed after some calls
+    pool.max_channel_calls = 2
+    stubs = pool.stubs
+    new_stubs = [pool.next_stub() for _ in range(2)]
+    assert new_stubs == pool.stubs
+    assert not set(new_stubs) & set(stubs)
+
+    # evicted channels are closed
+    evict_grpc_channel_pool("localhost", 8500)
+    assert pool.closed
+    assert get_grpc_channel_pool("localhost", 8500) is not pool
+
+
+def test_grpc_channel_pool_release(grpc_channel_pools):
+    pytest.importorskip("tensorflow_serving")
+    pool = acquire_grpc_channel_pool("localhost", 8500)
+    assert acquire_grpc_channel_pool("localhost", 8500) is pool
+    assert get_grpc_channel_pool("localhost", 8500) is pool
+
+    # the pool is kept open as long as a model holds it
+    release_grpc_channel_pool(pool)
+    assert not pool.closed
+    assert get_grpc_channel_pool("localhost", 8500) is pool
+
+    release_grpc_channel_pool(pool)
+    assert pool.closed
+    assert get_grpc_channel_pool("localhost", 8500) is not pool
+
+
+def test_grpc_hedged_requests(monkeypatch):
+    pytest.importorskip("tensorflow_serving")
+    from concurrent import futures
+
+    from tensorflow_serving.apis import predict_pb2, prediction_service_pb2_grpc
+
+    calls = []
+
+    class SlowFirstServicer(prediction_service_pb2_grpc.PredictionServiceServicer):
+        def Predict(self, request, context):
+            calls.append(request.model_spec.name)
+            response = predict_pb2.PredictResponse()
+            if len(calls) == 1:
+                time.sleep(0.5)
+                response.model_spec.name = "slow"
+            else:
+                response.model_spec.name = "fast"
+            return response
+
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=4))
+    prediction_service_pb2_grpc.add_PredictionServiceServicer_to_server(
+        SlowFirstServicer(), server
+    )
+    port = server.add_insecure_port("localhost:0")
+    server.start()
+    try:
+        monkeypatch.setenv("MODELKIT_TF_SERVING_GRPC_HEDGE_DELAY_MS", "50")
+        pool = get_grpc_channel_pool("localhost", port)
+        request = predict_pb2.PredictRequest()
+        request.model_spec.name = "model"
+        assert pool.predict(request, 5).model_spec.name == "fast"
+        assert len(calls) == 2
+
+        # no hedged request for fast answers
+        assert pool.predict(request, 5).model_spec.name == "fast"
+        assert len(calls) == 3
+    finally:
+        evict_grpc_channel_pool("localhost", port)
+        pool.close()
+        server.stop(None)
+
+
+def test_grpc_retries_unavailable(monkeypatch):
+    pytest.importorskip("tensorflow_serving")
+    from concurrent import futures
+
+    from tensorflow_serving.apis import predict_pb2, prediction_service_pb2_grpc
+
+    calls = []
+
+    class UnavailableFirstServicer(
+        prediction_service_pb2_grpc.PredictionServiceServicer
+    ):
+        def Predict(self, request, context):
+            calls.append(request.model_spec.name)
+            if len(calls) == 1:
+                context.abort(grpc.StatusCode.UNAVAILABLE, "unavailable")
+            return predict_pb2.PredictResponse()
+
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=4))
+    prediction_service_pb2_grpc.add_PredictionServiceServicer_to_server(
+        UnavailableFirstServicer(), server
+    )
+    port = server.add_insecure_port("localhost:0")
+    server.start()
+    try:
+        pool = get_grpc_channel_pool("localhost", port)
+        request = predict_pb2.PredictRequest()
+        request.model_spec.name = "model"
+        pool.predict(request, 5)
+        assert len(calls) == 2
+    finally:
+        evict_grpc_channel_pool("localhost", port)
+        pool.close()
+        server.stop(None)
+
+
+def test_retry_tf_serving(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(time, "sleep", sleeps.append)
+    monkeypatch.setenv("MODELKIT_TF_SERVING_ATTEMPTS", "3")
+    calls = []
+
+    def _fail_twice():
+        calls.append(None)
+        if len(calls) < 3:
+            raise ValueError
+        return "ok"
+
+    assert retry_tf_serving("test", _fail_twice) == "ok"
+    assert len(calls) == 3
+    assert len(sleeps) == 2 and all(0 <= s <= 2 for s in sleeps)
+
+    def _fail():
+        raise ValueError
+
+    with pytest.raises(ValueError):
+        retry_tf_serving("test", _fail)
+    assert len(sleeps) == 4
+
+    # the upper bound of the delay grows exponentially, up to 20s
+    sleeps.clear()
+    monkeypatch.setattr(tensorflow_model.random, "uniform", lambda a, b: b)
+    monkeypatch.setenv("MODELKIT_TF_SERVING_ATTEMPTS", "8")
+    with pytest.raises(ValueError):
+        retry_tf_serving("test", _fail)
+    assert sleeps == [1, 2, 4, 8, 16, 20, 20]
+
+
+def test_connect_tf_serving_rest_retries_timeouts(monkeypatch):
+    monkeypatch.setattr(time, "sleep", lambda _: None)
+    monkeypatch.setenv("MODELKIT_TF_SERVING_ATTEMPTS", "3")
+    monkeypatch.setenv("MODELKIT_TF_SERVING_CONNECT_TIMEOUT_S", "0.5")
+    timeouts = []
+
+    class WarmingUpSession:
+        def get(self, url, timeout):
+            timeouts.append(timeout)
+            if len(timeouts) < 3:
+                raise requests.exceptions.ReadTimeout
+            response = requests.Response()
+            response.status_code = 200
+            return response
+
+    monkeypatch.setattr(
+        tensorflow_model, "get_rest_session", lambda: WarmingUpSession()
+    )
+    connect_tf_serving_rest("model", "localhost", 8501)
+    assert timeouts == [0.5, 0.5, 0.5]
+
+    timeouts.clear()
+    monkeypatch.setenv("MODELKIT_TF_SERVING_ATTEMPTS", "2")
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        connect_tf_serving_rest("model", "localhost", 8501)
+
+
+@pytest.mark.asyncio
+async def test_async_tf_model_rest_error(monkeypatch):
+    from aiohttp import web
+
+    async def _predict(request):
+        return web.Response(status=500, text="model is broken")
+
+    app = web.Application()
+    app.router.add_post("/v1/models/dummy:predict", _predict)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "localhost", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    # the REST check is synchronous, it would block the event loop serving it
+    monkeypatch.setattr(tensorflow_model, "connect_tf_serving", lambda *args: None)
+    model = AsyncTensorflowModel(
+        output_tensor_mapping={"lambda": "nothing"},
+        output_shapes={"lambda": (3, 2, 1)},
+        output_dtypes={"lambda": np.float32},
+        tf_model_name="dummy",
+        service_settings=LibrarySettings(
+            tf_serving={
+                "enable": True,
+                "port": port,
+                "mode": "rest",
+                "host": "localhost",
+            }
+        ),
+    )
+    try:
+        with pytest.raises(
+            tensorflow_model.TFServingError,
+            match=r"TF Serving error \[Internal Server Error\]: model is broken",
+        ):
+            await model._tensorflow_predict({"x": np.zeros((1, 2))})
+    finally:
+        await model.close()
+        await runner.cleanup()
+
+
+def test_grpc_compression(monkeypatch):
+    assert grpc_compression() is None
+    monkeypatch.setenv("MODELKIT_TF_SERVING_GRPC_COMPRESSION", "none")
+    assert grpc_compression() is None
+    monkeypatch.setenv("MODELKIT_TF_SERVING_GRPC_COMPRESSION", "gzip")
+    assert grpc_compression() == grpc.Compression.Gzip
+    monkeypatch.setenv("MODELKIT_TF_SERVING_GRPC_COMPRESSION", "zstd")
+    with pytest.raises(ValueError):
+        grpc_compression()
+
+
 @skip_unless("ENABLE_TF_TEST", "True")
 def test_write_tf_serving_config(base_dir, assetsmanager_settings):
     write_config(os.path.join(base_dir, "test.config"), {"model0": "/some/path"})
@@ -397,7 +642,7 @@ def test_iso_serving_mode_no_serving(dummy_tf_models, monkeypatch, working_dir):
     monkeypatch.setenv("MODELKIT_STORAGE_PREFIX", "testdata")
     monkeypatch.setenv("MODELKIT_STORAGE_PROVIDER", "local")
     monkeypatch.setenv("MODELKIT_ASSETS_DIR", working_dir)
-    monkeypatch.setenv("MODELKIT_TF_SERVING_ATTEMPTS", 1)
+    monkeypatch.setenv("MODELKIT_TF_SERVING_ATTEMPTS", "1")
     # Get the prediction service running TF with gRPC serving
 
     with pytest.raises(grpc.RpcError):